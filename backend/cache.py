@@ -0,0 +1,38 @@
+# Cache em memória com expiração por tempo
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from metrics import REGISTRY
+
+
+class TTLCache:
+    """Cache por processo com TTL curto; writes chamam clear() para invalidar"""
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 128):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        REGISTRY.register_cache(name, self.stats)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Descarta a entrada mais antiga (dict mantém ordem de inserção)
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
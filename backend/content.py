@@ -0,0 +1,210 @@
+# Catálogo de conteúdo do jogo carregado de pacotes versionados (JSON/YAML)
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+ROOT_DIR = Path(__file__).parent
+DEFAULT_PACK = ROOT_DIR / 'data' / 'packs' / 'base.json'
+
+ATTRIBUTES = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+MAX_LEVEL = 20
+
+
+class ContentPackError(ValueError):
+    """Pacote de conteúdo inválido"""
+
+
+def _freeze(value: Any) -> Any:
+    """Converte dicts e listas em estruturas somente leitura"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _parse_die(die: str, where: str) -> int:
+    try:
+        count, sides = die.split("d")
+        if int(count) < 1 or int(sides) < 1:
+            raise ValueError
+        return int(sides)
+    except ValueError:
+        raise ContentPackError(f"{where}: dado inválido '{die}'") from None
+
+
+@dataclass(frozen=True, eq=False)
+class ContentCatalog:
+    """Catálogo imutável e indexado; substituído por inteiro a cada recarga (hash por identidade)"""
+    version: str
+    etag: str
+    clans: Tuple[Mapping[str, Any], ...]
+    classes: Tuple[Mapping[str, Any], ...]
+    conditions: Tuple[str, ...]
+    xp_table: Mapping[int, int]
+    proficiency_table: Mapping[int, int]
+    clans_by_id: Mapping[str, Mapping[str, Any]]
+    classes_by_id: Mapping[str, Mapping[str, Any]]
+    # Respostas JSON pré-serializadas das rotas de catálogo
+    rendered: Mapping[str, bytes]
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def clan(self, clan_id: str) -> Optional[Mapping[str, Any]]:
+        return self.clans_by_id.get(clan_id)
+
+    def char_class(self, class_id: str) -> Optional[Mapping[str, Any]]:
+        return self.classes_by_id.get(class_id)
+
+    def proficiency_bonus(self, level: int) -> int:
+        """Retorna o bônus de proficiência baseado no nível"""
+        return self.proficiency_table[min(max(level, 1), MAX_LEVEL)]
+
+    def level_from_xp(self, xp: int) -> int:
+        """Retorna o nível baseado no XP atual"""
+        for lvl in range(MAX_LEVEL, 0, -1):
+            if xp >= self.xp_table[lvl]:
+                return lvl
+        return 1
+
+    def xp_for_next_level(self, current_level: int) -> int:
+        """Retorna o XP necessário para o próximo nível"""
+        if current_level >= MAX_LEVEL:
+            return self.xp_table[MAX_LEVEL]
+        return self.xp_table[current_level + 1]
+
+
+def _level_table(raw: Any, name: str) -> Dict[int, int]:
+    if not isinstance(raw, dict):
+        raise ContentPackError(f"{name} deve ser um objeto nível -> valor")
+    try:
+        table = {int(level): int(value) for level, value in raw.items()}
+    except (TypeError, ValueError):
+        raise ContentPackError(f"{name} contém valores não inteiros") from None
+    if sorted(table) != list(range(1, MAX_LEVEL + 1)):
+        raise ContentPackError(f"{name} deve cobrir os níveis 1 a {MAX_LEVEL}")
+    return table
+
+
+def build_catalog(raw: Dict[str, Any], source: bytes) -> ContentCatalog:
+    """Valida o pacote e monta o catálogo indexado"""
+    version = raw.get("version")
+    if not isinstance(version, str) or not version:
+        raise ContentPackError("version é obrigatório")
+
+    clans = raw.get("clans")
+    classes = raw.get("classes")
+    conditions = raw.get("conditions")
+    if not isinstance(clans, list) or not clans:
+        raise ContentPackError("clans deve ser uma lista não vazia")
+    if not isinstance(classes, list) or not classes:
+        raise ContentPackError("classes deve ser uma lista não vazia")
+    if not isinstance(conditions, list) or not all(isinstance(c, str) for c in conditions):
+        raise ContentPackError("conditions deve ser uma lista de textos")
+    if "Normal" not in conditions:
+        raise ContentPackError("conditions deve conter 'Normal'")
+
+    clans_by_id: Dict[str, Dict[str, Any]] = {}
+    for clan in clans:
+        if not isinstance(clan, dict):
+            raise ContentPackError("cada clã deve ser um objeto")
+        clan_id = clan.get("id")
+        if not clan_id or clan_id in clans_by_id:
+            raise ContentPackError(f"clã sem id ou duplicado: {clan_id!r}")
+        bonuses = clan.get("bonuses", {})
+        if set(bonuses) - set(ATTRIBUTES) or not all(isinstance(v, int) for v in bonuses.values()):
+            raise ContentPackError(f"clã {clan_id}: bônus inválidos")
+        clans_by_id[clan_id] = clan
+
+    classes_by_id: Dict[str, Dict[str, Any]] = {}
+    for char_class in classes:
+        if not isinstance(char_class, dict):
+            raise ContentPackError("cada classe deve ser um objeto")
+        class_id = char_class.get("id")
+        if not class_id or class_id in classes_by_id:
+            raise ContentPackError(f"classe sem id ou duplicada: {class_id!r}")
+        _parse_die(char_class.get("hit_die", ""), f"classe {class_id}")
+        _parse_die(char_class.get("chakra_die", ""), f"classe {class_id}")
+        classes_by_id[class_id] = char_class
+
+    xp_table = _level_table(raw.get("xp_table"), "xp_table")
+    if any(xp_table[lvl] >= xp_table[lvl + 1] for lvl in range(1, MAX_LEVEL)):
+        raise ContentPackError("xp_table deve ser crescente")
+    proficiency_table = _level_table(raw.get("proficiency_bonus"), "proficiency_bonus")
+
+    rendered = {
+        "clans": _encode(clans),
+        "classes": _encode(classes),
+        "conditions": _encode(conditions),
+        "xp_table": _encode({str(k): v for k, v in xp_table.items()}),
+        **{f"clan:{k}": _encode(v) for k, v in clans_by_id.items()},
+        **{f"class:{k}": _encode(v) for k, v in classes_by_id.items()},
+    }
+
+    etag = hashlib.sha256(version.encode("utf-8") + b"\0" + source).hexdigest()[:16]
+    frozen_clans = _freeze(clans)
+    frozen_classes = _freeze(classes)
+    return ContentCatalog(
+        version=version,
+        etag=f'"{etag}"',
+        clans=frozen_clans,
+        classes=frozen_classes,
+        conditions=tuple(conditions),
+        xp_table=MappingProxyType(xp_table),
+        proficiency_table=MappingProxyType(proficiency_table),
+        clans_by_id=MappingProxyType({c["id"]: c for c in frozen_clans}),
+        classes_by_id=MappingProxyType({c["id"]: c for c in frozen_classes}),
+        rendered=MappingProxyType(rendered),
+    )
+
+
+def load_pack(path: Path) -> ContentCatalog:
+    """Lê e valida um pacote de conteúdo (bloqueante; use em thread)"""
+    source = path.read_bytes()
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ContentPackError("PyYAML é necessário para pacotes YAML") from None
+        try:
+            raw = yaml.safe_load(source)
+        except yaml.YAMLError as e:
+            raise ContentPackError(f"YAML inválido: {e}") from None
+    else:
+        try:
+            raw = json.loads(source)
+        except ValueError as e:
+            raise ContentPackError(f"JSON inválido: {e}") from None
+    if not isinstance(raw, dict):
+        raise ContentPackError("o pacote deve ser um objeto")
+    return build_catalog(raw, source)
+
+
+class ContentStore:
+    """Mantém o catálogo atual; recargas trocam a referência atomicamente"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.current: ContentCatalog = load_pack(path)
+        self._reload_lock = asyncio.Lock()
+
+    async def reload(self) -> ContentCatalog:
+        # Leitura e validação fora do event loop; em caso de erro o catálogo atual continua valendo
+        async with self._reload_lock:
+            catalog = await asyncio.to_thread(load_pack, self.path)
+            self.current = catalog
+            return catalog
+
+
+def create_content_store() -> ContentStore:
+    """Cria o catálogo a partir de CONTENT_PACK (padrão: data/packs/base.json)"""
+    return ContentStore(Path(os.environ.get('CONTENT_PACK', str(DEFAULT_PACK))))
@@ -1,16 +0,0 @@
-# Lista de condições do Naruto RPG
-CONDITIONS = [
-    "Normal",
-    "Agarrado",
-    "Atordoado",
-    "Caído",
-    "Cego",
-    "Enfeitiçado",
-    "Envenenado",
-    "Exausto",
-    "Incapacitado",
-    "Inconsciente",
-    "Paralisado",
-    "Petrificado",
-    "Surdo"
-]
@@ -0,0 +1,33 @@
+# Sondas de saúde (liveness/readiness) com resultado em cache
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+
+class ReadinessProbe:
+    """Executa a verificação no máximo uma vez por TTL, mesmo com muitas sondas simultâneas"""
+
+    def __init__(self, check: Callable[[], Awaitable[None]], ttl: float = 2.0, timeout: float = 2.0):
+        self.check = check
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ready = False
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def status(self) -> bool:
+        if time.monotonic() - self.checked_at < self.ttl:
+            return self.ready
+        async with self._lock:
+            # Outra sonda pode ter atualizado o resultado enquanto esperávamos
+            if time.monotonic() - self.checked_at < self.ttl:
+                return self.ready
+            try:
+                await asyncio.wait_for(self.check(), timeout=self.timeout)
+                self.ready, self.error = True, None
+            except Exception as e:
+                # Só o tipo do erro é exposto na resposta da sonda
+                self.ready, self.error = False, type(e).__name__
+            self.checked_at = time.monotonic()
+            return self.ready
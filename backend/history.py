@@ -0,0 +1,86 @@
+# Histórico de alterações dos personagens: diffs compactos e checkpoints periódicos
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from storage import HistoryRepository, UpdateResult
+
+# Metadados que não entram nos diffs (ficam na própria entrada)
+IGNORED_FIELDS = {"version", "updated_at"}
+
+_MISSING = object()
+
+
+def diff_fields(before: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Mantém apenas os campos do $set cujo valor realmente mudou"""
+    return {
+        key: value for key, value in fields.items()
+        if key not in IGNORED_FIELDS and before.get(key, _MISSING) != value
+    }
+
+
+def _timestamp(doc: Dict[str, Any]) -> str:
+    updated_at = doc.get("updated_at") or doc.get("created_at")
+    if isinstance(updated_at, datetime):
+        return updated_at.isoformat()
+    return updated_at or datetime.now(timezone.utc).isoformat()
+
+
+class CharacterHistory:
+    """Grava e reconstrói o histórico; o custo da reconstrução é limitado pelo intervalo de checkpoints"""
+
+    def __init__(self, repository: HistoryRepository, checkpoint_interval: int = 20):
+        self.repository = repository
+        self.checkpoint_interval = max(1, checkpoint_interval)
+
+    async def record_created(self, doc: Dict[str, Any]) -> None:
+        await self.repository.append({
+            "character_id": doc["id"],
+            "version": doc.get("version", 1),
+            "timestamp": _timestamp(doc),
+            "is_checkpoint": True,
+            "changes": {},
+            "checkpoint": doc,
+        })
+
+    async def record_update(self, result: UpdateResult, fields: Dict[str, Any]) -> None:
+        after = result.after
+        version = after["version"]
+        if "version" not in result.before:
+            # Documento anterior ao versionamento: o estado antes da primeira escrita vira a versão 0
+            await self.repository.append({
+                "character_id": after["id"],
+                "version": 0,
+                "timestamp": _timestamp(result.before),
+                "is_checkpoint": True,
+                "changes": {},
+                "checkpoint": result.before,
+            })
+        is_checkpoint = version % self.checkpoint_interval == 0
+        await self.repository.append({
+            "character_id": after["id"],
+            "version": version,
+            "timestamp": _timestamp(after),
+            "is_checkpoint": is_checkpoint,
+            "changes": diff_fields(result.before, fields),
+            "checkpoint": after if is_checkpoint else None,
+        })
+
+    async def state_at(self, character_id: str, version: Optional[int] = None,
+                       until: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Reconstrói o personagem em uma versão ou instante"""
+        until_iso = None
+        if until is not None:
+            # Instantes sem fuso são tratados como UTC
+            if until.tzinfo is None:
+                until = until.replace(tzinfo=timezone.utc)
+            until_iso = until.astimezone(timezone.utc).isoformat()
+        checkpoint = await self.repository.latest_checkpoint(character_id, version, until_iso)
+        if checkpoint is None:
+            return None
+
+        state = dict(checkpoint["checkpoint"])
+        for entry in await self.repository.entries_after(character_id, checkpoint["version"], version, until_iso):
+            state.update(entry["changes"])
+            state["version"] = entry["version"]
+            state["updated_at"] = entry["timestamp"]
+        return state
@@ -0,0 +1,128 @@
+# Idempotency-Key: repetições de uma escrita devolvem a resposta original
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from storage import IdempotencyRepository
+
+MAX_KEY_LENGTH = 200
+
+logger = logging.getLogger(__name__)
+
+
+async def _send_json(send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI: escritas com Idempotency-Key são executadas uma vez e a resposta fica gravada por ttl"""
+
+    def __init__(self, app, repository: IdempotencyRepository, ttl: float = 86400, lease: float = 30,
+                 methods: Iterable[str] = ("POST", "PUT", "PATCH", "DELETE")):
+        self.app = app
+        self.repository = repository
+        self.ttl = ttl
+        # Prazo da reserva em andamento: depois dele (worker morto, falha ao gravar) outra tentativa a assume
+        self.lease = lease
+        self.methods = set(methods)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        header = dict(scope["headers"]).get(b"idempotency-key")
+        if header is None:
+            await self.app(scope, receive, send)
+            return
+        if not header or len(header) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Idempotency-Key inválida")
+            return
+
+        # Lê o corpo inteiro para identificar a requisição e depois o repassa à aplicação
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        request_body = b"".join(chunks)
+
+        # A chave vale por método e caminho; o fingerprint detecta reuso com outra query string ou outro corpo
+        key = f"{scope['method']} {scope['path']} {header.decode('latin-1')}"
+        # A query string não tem \n cru (viria como %0A): o separador não é ambíguo
+        fingerprint = hashlib.sha256(scope.get("query_string", b"") + b"\n" + request_body).hexdigest()
+        owner = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl)
+        locked_until = now + timedelta(seconds=self.lease)
+
+        record = await self.repository.reserve(key, fingerprint, owner, expires_at, locked_until)
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key já usada com outra requisição")
+            elif record.get("status_code") is None:
+                await _send_json(send, 409, "Requisição com esta Idempotency-Key ainda em andamento")
+            else:
+                body = bytes(record["body"] or b"")
+                await send({
+                    "type": "http.response.start",
+                    "status": record["status_code"],
+                    "headers": [
+                        (b"content-type", (record.get("content_type") or "application/json").encode("latin-1")),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"idempotent-replayed", b"true"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": request_body, "more_body": False}
+            return await receive()
+
+        status = [500]
+        content_type = [b"application/json"]
+        response_chunks = []
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type[0] = value
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await self.repository.release(key, owner)
+            raise
+
+        # Erros do servidor não são gravados: a repetição executa de novo
+        try:
+            if status[0] >= 500:
+                await self.repository.release(key, owner)
+            else:
+                await self.repository.complete(
+                    key, owner, status[0], content_type[0].decode("latin-1"), b"".join(response_chunks)
+                )
+        except Exception:
+            # A resposta já foi enviada; a reserva expira sozinha ao fim do lease
+            logger.exception("Falha ao gravar a resposta da Idempotency-Key %s", header.decode("latin-1"))
@@ -0,0 +1,113 @@
+# Logging estruturado (JSON) fora do event loop: QueueHandler -> QueueListener
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Id da requisição atual (propagado para todas as linhas de log da requisição)
+REQUEST_ID: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos padrão de LogRecord; o resto veio de extra= e vai para o JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+access_logger = logging.getLogger("access")
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro; a mensagem só é montada aqui, na thread do listener"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextQueueHandler(QueueHandler):
+    """Enfileira o registro sem formatá-lo; só captura o id da requisição"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = REQUEST_ID.get()
+        return record
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """Troca os handlers da raiz e do uvicorn por uma fila; o listener retornado escreve em stdout"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(ContextQueueHandler(log_queue))
+    root.setLevel(level)
+
+    # O uvicorn configura os próprios handlers (stdout síncrono, propagate=False) antes de importar o app:
+    # os logs de erro passam a subir para a fila; o de acesso é desligado, RequestLogMiddleware já o registra
+    for name, propagate in (("uvicorn", True), ("uvicorn.error", True), ("uvicorn.access", False)):
+        uvicorn_logger = logging.getLogger(name)
+        for handler in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = propagate
+    return QueueListener(log_queue, stream, respect_handler_level=True)
+
+
+class RequestLogMiddleware:
+    """Middleware ASGI: id por requisição (X-Request-ID), duração e log de acesso com amostragem por rota"""
+
+    def __init__(self, app, sample_rates: Optional[Dict[str, float]] = None, slow_threshold: float = 1.0):
+        self.app = app
+        self.sample_rates = sample_rates or {}
+        self.slow_threshold = slow_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        token = REQUEST_ID.set(request_id)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            # Erros e requisições lentas são sempre registrados; o resto segue a taxa da rota
+            rate = self.sample_rates.get(route, 1.0)
+            if status[0] >= 500 or duration >= self.slow_threshold or rate >= 1.0 or random.random() < rate:
+                access_logger.info(
+                    "%s %s %s", scope["method"], route, status[0],
+                    extra={
+                        "method": scope["method"],
+                        "route": route,
+                        "status": status[0],
+                        "duration_ms": round(duration * 1000, 2),
+                        "sample_rate": rate,
+                    }
+                )
+            REQUEST_ID.reset(token)
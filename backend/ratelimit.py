@@ -0,0 +1,259 @@
+# Limite de taxa por token bucket (por cliente e por personagem)
+import asyncio
+import ipaddress
+import json
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from starlette.routing import compile_path
+
+from metrics import REGISTRY
+from storage.sqlite import SqliteDatabase
+
+RATE_LIMITED = REGISTRY.counter(
+    "http_rate_limited_total", "Requisições recusadas pelo limite de taxa", ("route", "scope")
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """rate tokens por segundo, acumulando até burst"""
+    rate: float
+    burst: float
+
+
+def parse_limit(value: str) -> Optional[RateLimit]:
+    """Lê 'taxa:rajada' (ex.: '5:20'); vazio ou 'off' desativa o limite"""
+    if not value or value.lower() == "off":
+        return None
+    rate, _, burst = value.partition(":")
+    limit = RateLimit(float(rate), float(burst or rate))
+    # Taxa zero dividiria o tempo de espera por zero; rajada abaixo de 1 nunca libera um token
+    if not (math.isfinite(limit.rate) and limit.rate > 0 and math.isfinite(limit.burst) and limit.burst >= 1):
+        raise ValueError(f"Limite de taxa inválido: {value!r} (taxa > 0 e rajada >= 1)")
+    return limit
+
+
+# Um bucket a verificar: (chave, limite)
+Bucket = Tuple[str, RateLimit]
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _refill(tokens: float, updated: float, now: float, limit: RateLimit) -> float:
+    """Tokens disponíveis agora"""
+    return min(limit.burst, tokens + (now - updated) * limit.rate)
+
+
+def _take_all(levels: List[float], buckets: Sequence[Bucket]) -> Tuple[Optional[int], float]:
+    """Consome um token de cada bucket só se todos tiverem; senão retorna (índice do que recusou, espera)"""
+    for index, (tokens, (_, limit)) in enumerate(zip(levels, buckets)):
+        if tokens < 1:
+            return index, (1 - tokens) / limit.rate
+    for index in range(len(levels)):
+        levels[index] -= 1
+    return None, 0.0
+
+
+class MemoryBucketStore:
+    """Buckets do processo; os ociosos são descartados pela ordem de uso (O(1) por acesso)"""
+
+    def __init__(self, idle_ttl: float = 600, max_buckets: int = 100000):
+        self.idle_ttl = idle_ttl
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, buckets: Sequence[Bucket]) -> Tuple[Optional[int], float]:
+        now = time.monotonic()
+        levels = []
+        for key, limit in buckets:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            levels.append(_refill(tokens, updated, now, limit))
+        rejected, wait = _take_all(levels, buckets)
+        for (key, _), tokens in zip(buckets, levels):
+            self._buckets[key] = (tokens, now)
+
+        # O mais antigo fica no início: para na primeira entrada ainda ativa
+        while self._buckets:
+            oldest_key, (_, oldest_updated) = next(iter(self._buckets.items()))
+            if now - oldest_updated < self.idle_ttl and len(self._buckets) <= self.max_buckets:
+                break
+            del self._buckets[oldest_key]
+        return rejected, wait
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+class SqliteBucketStore:
+    """Buckets num arquivo SQLite local, compartilhados pelos workers do mesmo nó"""
+
+    # A cada quantas operações os buckets ociosos são apagados
+    EVICT_EVERY = 1000
+
+    def __init__(self, path: str, idle_ttl: float = 600):
+        self.database = SqliteDatabase(path)
+        self.idle_ttl = idle_ttl
+        self._operations = 0
+        self._schema_ready = False
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limit_updated ON rate_limit_buckets (updated)")
+
+    async def take(self, buckets: Sequence[Bucket]) -> Tuple[Optional[int], float]:
+        if not self._schema_ready:
+            await asyncio.to_thread(self.database.open)
+            await self.database.transaction(self._ensure_schema)
+            self._schema_ready = True
+
+        self._operations += 1
+        evict = self._operations % self.EVICT_EVERY == 0
+
+        def apply(conn: sqlite3.Connection) -> Tuple[Optional[int], float]:
+            # Relógio de parede: os workers são processos diferentes
+            now = time.time()
+            levels = []
+            for key, limit in buckets:
+                row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = (row["tokens"], row["updated"]) if row else (limit.burst, now)
+                levels.append(_refill(tokens, updated, now, limit))
+            rejected, wait = _take_all(levels, buckets)
+            conn.executemany(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, tokens, now) for (key, _), tokens in zip(buckets, levels)]
+            )
+            if evict:
+                conn.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - self.idle_ttl,))
+            return rejected, wait
+
+        return await self.database.transaction(apply)
+
+    async def close(self) -> None:
+        self.database.close()
+        self._schema_ready = False
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """Limites de uma rota: por cliente e, se a rota tiver {character_id}, por personagem"""
+    method: str
+    path: str
+    client: Optional[RateLimit] = None
+    character: Optional[RateLimit] = None
+
+
+async def _reject(send, wait: float) -> None:
+    retry_after = max(1, math.ceil(wait))
+    body = json.dumps(
+        {"detail": f"Muitas requisições; tente novamente em {retry_after} s"}, ensure_ascii=False
+    ).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def parse_networks(value: str) -> List[Network]:
+    """Lê uma lista de CIDRs separados por vírgula (ex.: '10.0.0.0/8,127.0.0.1')"""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: aplica os limites configurados antes do roteamento"""
+
+    def __init__(self, app, limits: List[RouteLimit], store=None, proxy_hops: int = 0,
+                 trusted_proxies: Sequence[Network] = ()):
+        self.app = app
+        self.store = store or MemoryBucketStore()
+        # Atrás de proxies o IP da conexão é o do proxy: o cliente vem do X-Forwarded-For,
+        # descontando proxy_hops saltos ou os endereços das redes confiáveis (da direita para a esquerda)
+        self.proxy_hops = proxy_hops
+        self.trusted_proxies = list(trusted_proxies)
+        # Só as rotas limitadas são comparadas (regex do próprio Starlette)
+        self.routes = [(limit, compile_path(limit.path)[0]) for limit in limits if limit.client or limit.character]
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _client(self, scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self.proxy_hops and not self.trusted_proxies:
+            return peer
+        forwarded = dict(scope["headers"]).get(b"x-forwarded-for", b"").decode("latin-1")
+        chain = [address.strip() for address in forwarded.split(",") if address.strip()] + [peer]
+        if self.proxy_hops:
+            # Cada proxy acrescenta o endereço de quem o chamou; os mais à esquerda podem ser forjados
+            return chain[max(0, len(chain) - 1 - self.proxy_hops)]
+        while len(chain) > 1 and self._trusted(chain[-1]):
+            chain.pop()
+        return chain[-1]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for limit, regex in self.routes:
+                if scope["method"] != limit.method:
+                    continue
+                match = regex.match(scope["path"])
+                if match is None:
+                    continue
+                scopes: List[str] = []
+                buckets: List[Bucket] = []
+                if limit.client:
+                    scopes.append("client")
+                    buckets.append((f"client:{self._client(scope)}:{limit.method} {limit.path}", limit.client))
+                character_id = match.groupdict().get("character_id")
+                if limit.character and character_id:
+                    scopes.append("character")
+                    buckets.append((f"character:{character_id}:{limit.method} {limit.path}", limit.character))
+                if not buckets:
+                    break
+                # Os buckets são verificados juntos: uma recusa não gasta o token dos outros
+                rejected, wait = await self.store.take(buckets)
+                if rejected is not None:
+                    RATE_LIMITED.inc(limit.path, scopes[rejected])
+                    await _reject(send, wait)
+                    return
+                break
+        await self.app(scope, receive, send)
+
+
+def routes_from_env(environ: Dict[str, str]) -> List[RouteLimit]:
+    """Limites padrão das rotas quentes; cada um pode ser trocado (ou 'off') por variável de ambiente"""
+    return [
+        RouteLimit(
+            "POST", "/api/roll-dice",
+            client=parse_limit(environ.get('RATE_LIMIT_ROLL_DICE', '5:20')),
+        ),
+        RouteLimit(
+            "PATCH", "/api/characters/{character_id}/quick-stats",
+            client=parse_limit(environ.get('RATE_LIMIT_QUICK_STATS', '10:30')),
+            character=parse_limit(environ.get('RATE_LIMIT_QUICK_STATS_CHARACTER', '5:20')),
+        ),
+        RouteLimit(
+            "PUT", "/api/characters/{character_id}",
+            client=parse_limit(environ.get('RATE_LIMIT_CHARACTER_UPDATE', '2:10')),
+            character=parse_limit(environ.get('RATE_LIMIT_CHARACTER_UPDATE_CHARACTER', '1:5')),
+        ),
+    ]
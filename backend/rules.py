@@ -0,0 +1,135 @@
+# Motor de regras dos atributos derivados (modificadores, HP, Chakra, CA, proficiência)
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from content import ATTRIBUTES, MAX_LEVEL, ContentCatalog
+from metrics import REGISTRY
+
+LEVELS = np.arange(1, MAX_LEVEL + 1)
+
+CONSTITUTION = ATTRIBUTES.index("constitution")
+DEXTERITY = ATTRIBUTES.index("dexterity")
+
+
+def _die_sides(die: str) -> int:
+    return int(die.split('d')[1])
+
+
+def derive(hit_sides: int, chakra_sides: int, con_mod: int, dex_mod: int, level: Any, proficiency: Any):
+    """Fórmulas de HP, Chakra e CA; aceitam um nível ou um vetor numpy de níveis"""
+    hp = np.maximum(1, (hit_sides + con_mod) * level)
+    chakra = np.maximum(1, (chakra_sides + con_mod) * level)
+    armor_class = 10 + dex_mod + proficiency // 2
+    return hp, chakra, armor_class
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Regras de um par (clã, classe): dados e bônus já resolvidos"""
+    catalog: ContentCatalog
+    clan_id: str
+    class_id: str
+    hit_sides: int
+    chakra_sides: int
+    bonuses: Tuple[int, ...]
+
+    def modifiers(self, scores: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Modificadores com os bônus do clã aplicados aos atributos"""
+        return tuple((score + bonus - 10) // 2 for score, bonus in zip(scores, self.bonuses))
+
+    def stats(self, scores: Tuple[int, ...], level: int) -> Tuple[int, int, int, int, Tuple[int, ...]]:
+        modifiers = self.modifiers(scores)
+        proficiency = self.catalog.proficiency_bonus(level)
+        hp, chakra, armor_class = derive(
+            self.hit_sides, self.chakra_sides, modifiers[CONSTITUTION], modifiers[DEXTERITY], level, proficiency
+        )
+        return int(hp), int(chakra), int(armor_class), proficiency, modifiers
+
+
+@lru_cache(maxsize=256)
+def compile_rules(catalog: ContentCatalog, clan_id: str, class_id: str) -> Optional[CompiledRules]:
+    """Compila o par (clã, classe) uma vez por catálogo; None se algum não existir"""
+    clan = catalog.clan(clan_id)
+    char_class = catalog.char_class(class_id)
+    if clan is None or char_class is None:
+        return None
+    bonuses = clan.get('bonuses', {})
+    return CompiledRules(
+        catalog=catalog,
+        clan_id=clan_id,
+        class_id=class_id,
+        hit_sides=_die_sides(char_class['hit_die']),
+        chakra_sides=_die_sides(char_class['chakra_die']),
+        bonuses=tuple(bonuses.get(attribute, 0) for attribute in ATTRIBUTES),
+    )
+
+
+@lru_cache(maxsize=int(os.environ.get('STATS_CACHE_SIZE', '4096')))
+def _cached_stats(catalog: ContentCatalog, clan_id: str, class_id: str, scores: Tuple[int, ...],
+                  level: int) -> Optional[Tuple[int, int, int, int, Tuple[int, ...]]]:
+    rules = compile_rules(catalog, clan_id, class_id)
+    return rules.stats(scores, level) if rules else None
+
+
+def calculate_stats(catalog: ContentCatalog, clan_id: str, class_id: str, attributes: Mapping[str, int],
+                    level: int = 1) -> Optional[Dict[str, Any]]:
+    """Calcula HP, Chakra, CA, proficiência e modificadores; None se clã ou classe não existirem"""
+    scores = tuple(attributes[attribute] for attribute in ATTRIBUTES)
+    result = _cached_stats(catalog, clan_id, class_id, scores, level)
+    if result is None:
+        return None
+    hp, chakra, armor_class, proficiency, modifiers = result
+    return {
+        'hp': hp,
+        'max_hp': hp,
+        'chakra': chakra,
+        'max_chakra': chakra,
+        'armor_class': armor_class,
+        'proficiency_bonus': proficiency,
+        'modifiers': dict(zip(ATTRIBUTES, modifiers)),
+    }
+
+
+@lru_cache(maxsize=1024)
+def _progression(catalog: ContentCatalog, class_id: str, con_mod: int, dex_mod: int) -> Tuple[Dict[str, Any], ...]:
+    char_class = catalog.char_class(class_id)
+    proficiency = np.array([catalog.proficiency_table[lvl] for lvl in LEVELS])
+    xp = np.array([catalog.xp_table[lvl] for lvl in LEVELS])
+    hp, chakra, armor_class = derive(
+        _die_sides(char_class['hit_die']), _die_sides(char_class['chakra_die']), con_mod, dex_mod, LEVELS, proficiency
+    )
+    return tuple(
+        {
+            'level': int(level),
+            'xp': int(xp_required),
+            'hp': int(level_hp),
+            'chakra': int(level_chakra),
+            'armor_class': int(level_ac),
+            'proficiency_bonus': int(level_proficiency),
+        }
+        for level, xp_required, level_hp, level_chakra, level_ac, level_proficiency
+        in zip(LEVELS, xp, hp, chakra, armor_class, proficiency)
+    )
+
+
+def progression(catalog: ContentCatalog, clan_id: str, class_id: str,
+                attributes: Mapping[str, int]) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """Tabela 1-20 calculada de uma vez; memoizada por (classe, mod. CON, mod. DES) (não altere o resultado)"""
+    rules = compile_rules(catalog, clan_id, class_id)
+    if rules is None:
+        return None
+    modifiers = rules.modifiers(tuple(attributes[attribute] for attribute in ATTRIBUTES))
+    return _progression(catalog, class_id, modifiers[CONSTITUTION], modifiers[DEXTERITY])
+
+
+def _cache_stats(cached) -> Dict[str, float]:
+    info = cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+REGISTRY.register_cache("derived_stats", lambda: _cache_stats(_cached_stats))
+REGISTRY.register_cache("progression", lambda: _cache_stats(_progression))
@@ -1,37 +1,223 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
+import signal
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
+from contextlib import asynccontextmanager
 import uuid
-from datetime import datetime, timezone
-from data.clans import CLANS, get_proficiency_bonus, get_level_from_xp, get_xp_for_next_level
-from data.classes import CLASSES
+import base64
+import json
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+from cache import TTLCache
+from content import ContentPackError, create_content_store
+from health import ReadinessProbe
+from history import CharacterHistory
+from idempotency import IdempotencyMiddleware
+from logs import RequestLogMiddleware, setup_logging
+from metrics import REGISTRY, MetricsMiddleware
+from ratelimit import MemoryBucketStore, RateLimitMiddleware, SqliteBucketStore, parse_networks, routes_from_env
+from rules import calculate_stats, progression
+from storage import CharacterFilter, ItemNotFoundError, ItemOperation, UpdateResult, create_storage
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Conteúdo do jogo (clãs, classes, condições, tabela de XP) de um pacote versionado
+content = create_content_store()
+
+# Persistência (STORAGE_BACKEND: mongo, memory ou sqlite)
+storage = create_storage()
+
+# Histórico de alterações (diffs por escrita + checkpoints periódicos)
+history = CharacterHistory(
+    storage.history,
+    checkpoint_interval=int(os.environ.get('HISTORY_CHECKPOINT_INTERVAL', '20'))
+)
+
+# Buckets do limite de taxa: por processo (memory) ou compartilhados pelos workers do nó (sqlite)
+RATE_LIMIT_IDLE_TTL = float(os.environ.get('RATE_LIMIT_IDLE_TTL', '600'))
+if os.environ.get('RATE_LIMIT_STORE', 'memory').lower() == 'sqlite':
+    rate_limit_store = SqliteBucketStore(
+        os.environ.get('RATE_LIMIT_SQLITE_PATH', str(ROOT_DIR / 'rate_limit.db')), idle_ttl=RATE_LIMIT_IDLE_TTL
+    )
+else:
+    rate_limit_store = MemoryBucketStore(idle_ttl=RATE_LIMIT_IDLE_TTL)
+
+# Agregações do elenco: cache curto, invalidado pelas escritas
+roster_cache = TTLCache("roster_analytics", ttl=float(os.environ.get('ANALYTICS_CACHE_TTL', '30')))
+
+# Tarefas de fundo do worker (mantidas aqui para não serem coletadas; canceladas no shutdown)
+background_tasks = set()
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+# Cada worker confere a cada intervalo o pacote anunciado no banco e o acompanha
+CONTENT_POLL_INTERVAL = float(os.environ.get('CONTENT_POLL_INTERVAL', '10'))
+
+async def _announce_content(catalog) -> None:
+    """Anuncia o pacote carregado aos outros workers; se ele mudou, republica as fichas compartilhadas"""
+    try:
+        previous = await storage.settings.put('content', {'version': catalog.version, 'etag': catalog.etag})
+    except Exception:
+        logger.exception("Falha ao anunciar o pacote de conteúdo %s", catalog.version)
+        return
+    if previous is None or previous.get('etag') != catalog.etag:
+        _spawn(_republish_share_snapshots())
+
+async def _follow_content():
+    """Recarrega o pacote do disco quando o anunciado no banco difere do local"""
+    followed = None
+    while True:
+        await asyncio.sleep(CONTENT_POLL_INTERVAL)
+        try:
+            shared = await storage.settings.get('content')
+            if shared is None or shared['etag'] in (content.current.etag, followed):
+                continue
+            followed = shared['etag']
+            catalog = await content.reload()
+            if catalog.etag == shared['etag']:
+                logger.info("Conteúdo recarregado (anunciado por outro worker): versão %s", catalog.version)
+            else:
+                logger.warning(
+                    "Pacote local %s difere do anunciado %s; confira CONTENT_PACK neste nó",
+                    catalog.version, shared.get('version')
+                )
+        except Exception:
+            logger.exception("Falha ao acompanhar o pacote de conteúdo")
+
+async def _republish_share_snapshots():
+    """Renderiza de novo as fichas públicas com o pacote atual"""
+    # Espera os outros workers acompanharem o pacote: depois disso nenhum publica com o antigo
+    await asyncio.sleep(CONTENT_POLL_INTERVAL)
+    try:
+        after, count = None, 0
+        while True:
+            characters = await storage.characters.find_changed(after, limit=200)
+            for character in characters:
+                await publish_share_snapshot(character)
+            count += len(characters)
+            if len(characters) < 200:
+                break
+            after = (characters[-1]['updated_at'], characters[-1]['id'])
+        logger.info("Fichas compartilhadas republicadas com o pacote %s: %d", content.current.version, count)
+    except Exception:
+        logger.exception("Falha ao republicar fichas compartilhadas")
+
+async def _reload_content_on_signal():
+    try:
+        catalog = await content.reload()
+        logger.info("Conteúdo recarregado (SIGHUP): versão %s", catalog.version)
+    except (ContentPackError, OSError) as e:
+        logger.error("Falha ao recarregar conteúdo: %s", e)
+        return
+    await _announce_content(catalog)
+
+# Quantidade de notas recentes mantidas no documento do personagem
+NOTES_PREVIEW = int(os.environ.get('NOTES_PREVIEW', '3'))
+
+async def _migrate_embedded_notes():
+    """Move notas embutidas de personagens antigos para a coleção de notas"""
+    while True:
+        characters = await storage.characters.find_without_notes_count()
+        if not characters:
+            return
+        for char in characters:
+            notes = char.get('notes') or []
+            for note in notes:
+                if isinstance(note.get('created_at'), datetime):
+                    note['created_at'] = note['created_at'].isoformat()
+            await storage.notes.add_many([{**note, 'character_id': char['id']} for note in notes])
+            await storage.characters.migrate_notes(char['id'], notes[-NOTES_PREVIEW:], len(notes))
+        logger.info("Notas migradas de %d personagens", len(characters))
+
+# Estado da inicialização do backend (refeita em segundo plano se falhar no startup)
+storage_initialized = False
+STORAGE_INIT_MAX_BACKOFF = float(os.environ.get('STORAGE_INIT_MAX_BACKOFF', '30'))
+
+async def _init_storage():
+    global storage_initialized
+    await storage.init()
+    await _migrate_embedded_notes()
+    await _announce_content(content.current)
+    storage_initialized = True
+
+async def _retry_init_storage():
+    """Refaz a inicialização com backoff exponencial até o banco responder"""
+    delay = 1.0
+    while not storage_initialized:
+        await asyncio.sleep(delay)
+        try:
+            await _init_storage()
+            logger.info("Armazenamento inicializado")
+        except Exception as e:
+            delay = min(delay * 2, STORAGE_INIT_MAX_BACKOFF)
+            logger.warning("Falha ao inicializar o armazenamento (nova tentativa em %.0fs): %r", delay, e)
+
+async def _check_storage():
+    # A sonda só faz o ping; índices e migração ficam com _retry_init_storage
+    await storage.ping()
+    if not storage_initialized:
+        raise RuntimeError("Armazenamento ainda não inicializado")
+
+readiness = ReadinessProbe(
+    _check_storage,
+    ttl=float(os.environ.get('READINESS_CACHE_TTL', '2')),
+    timeout=float(os.environ.get('READINESS_TIMEOUT', '2'))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    
+    # Conecta, aquece o pool e cria índices antes de aceitar tráfego
+    try:
+        await _init_storage()
+    except Exception:
+        # O worker sobe mesmo assim; /api/health/ready fica 503 até a inicialização em segundo plano concluir
+        logger.exception("Falha ao inicializar o armazenamento")
+        _spawn(_retry_init_storage())
+    
+    # SIGHUP recarrega o pacote neste worker e o anuncia; os demais o acompanham pelo banco
+    _spawn(_follow_content())
+    if hasattr(signal, "SIGHUP"):
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.ensure_future(_reload_content_on_signal())
+            )
+        except (NotImplementedError, RuntimeError):
+            pass
+    
+    yield
+    
+    tasks = list(background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await storage.close()
+    await rate_limit_store.close()
+    # Esvazia a fila de logs antes de encerrar
+    log_listener.stop()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logs estruturados (JSON) escritos por uma thread separada; o listener roda durante o lifespan
+log_listener = setup_logging(logging.getLevelName(os.environ.get('LOG_LEVEL', 'INFO').upper()))
 logger = logging.getLogger(__name__)
 
 
@@ -67,6 +253,14 @@ class Note(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     content: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
+
+class NoteInput(BaseModel):
+    content: str = Field(min_length=1)
+
+class NotePage(BaseModel):
+    notes: List[Note]
+    next_cursor: Optional[str] = None
 
 class Character(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -110,11 +304,13 @@ class Character(BaseModel):
     # Modificadores
     modifiers: Dict[str, int]
     
-    # Notas extras (múltiplas)
+    # Notas recentes (a lista completa fica em /characters/{id}/notes)
     notes: List[Note] = []
+    notes_count: int = 0
     extra_notes: str = ""  # Manter por compatibilidade
     
     # Metadados
+    version: int = 1
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -147,7 +343,6 @@ class CharacterUpdate(BaseModel):
     max_chakra: Optional[int] = None
     armor_class: Optional[int] = None
     proficiency_bonus: Optional[int] = None
-    notes: Optional[List[Note]] = None
     extra_notes: Optional[str] = None
 
 class XPUpdate(BaseModel):
@@ -157,6 +352,62 @@ class QuickStatsUpdate(BaseModel):
     hp: Optional[int] = None
     chakra: Optional[int] = None
 
+class SyncResponse(BaseModel):
+    characters: List[Character]
+    deleted: List[str]
+    watermark: str
+    has_more: bool
+
+class ProgressionRequest(BaseModel):
+    clan_id: str
+    class_id: str
+    attributes: Attributes
+
+class ItemOperationInput(BaseModel):
+    op: Literal["add", "remove", "quantity"]
+    target: Literal["equipment", "weapons", "jutsus"]
+    name: str = Field(min_length=1)
+    quantity: int = 1  # quantidade inicial (add) ou variação (quantity)
+    details: str = ""  # apenas jutsus
+
+class ItemBatch(BaseModel):
+    operations: List[ItemOperationInput] = Field(min_length=1, max_length=50)
+
+class RestoreRequest(BaseModel):
+    version: Optional[int] = None
+    at: Optional[datetime] = None
+
+class CharacterSummaryDescription(BaseModel):
+    rank: str = ""
+    title: str = ""
+
+class CharacterSummary(BaseModel):
+    """Resumo do personagem usado na busca (sem inventário, jutsus e notas)"""
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    share_id: str
+    name: str
+    clan_id: str
+    class_id: str
+    level: int = 1
+    xp: int = 0
+    condition: str = "Normal"
+    hp: int
+    max_hp: int = 0
+    chakra: int
+    max_chakra: int = 0
+    armor_class: int
+    description: CharacterSummaryDescription = CharacterSummaryDescription()
+    updated_at: datetime
+
+# Campos lidos do banco para montar CharacterSummary
+SUMMARY_FIELDS = [
+    "id", "share_id", "name", "clan_id", "class_id", "level", "xp", "condition",
+    "hp", "max_hp", "chakra", "max_chakra", "armor_class",
+    "description.rank", "description.title", "updated_at"
+]
+
 
 def migrate_character_data(character: dict) -> dict:
     """Migra dados de personagem do formato antigo para o novo"""
@@ -199,6 +450,8 @@ def migrate_character_data(character: dict) -> dict:
         character['extra_notes'] = ""
     if 'notes' not in character:
         character['notes'] = []
+    if 'notes_count' not in character:
+        character['notes_count'] = len(character['notes'])
     if 'proficiencies' not in character:
         character['proficiencies'] = []
     if 'condition' not in character:
@@ -217,100 +470,152 @@ def migrate_character_data(character: dict) -> dict:
 
 
 # Helper functions
-def calculate_modifier(score: int) -> int:
-    """Calcula o modificador baseado na pontuação de atributo"""
-    return (score - 10) // 2
-
-def calculate_character_stats(char_data: dict, clan: dict, char_class: dict, level: int = 1) -> dict:
-    """Calcula HP, Chakra, CA e modificadores"""
-    attrs = char_data['attributes']
-    
-    # Calcular modificadores
-    modifiers = {
-        'strength': calculate_modifier(attrs['strength']),
-        'dexterity': calculate_modifier(attrs['dexterity']),
-        'constitution': calculate_modifier(attrs['constitution']),
-        'intelligence': calculate_modifier(attrs['intelligence']),
-        'wisdom': calculate_modifier(attrs['wisdom']),
-        'charisma': calculate_modifier(attrs['charisma'])
-    }
-    
-    # Calcular HP (dado de vida + modificador de constituição) * nível
-    hit_die_value = int(char_class['hit_die'].split('d')[1])
-    hp = (hit_die_value + modifiers['constitution']) * level
-    hp = max(1, hp)
-    
-    # Calcular Chakra (dado de chakra + modificador de constituição) * nível
-    chakra_die_value = int(char_class['chakra_die'].split('d')[1])
-    chakra = (chakra_die_value + modifiers['constitution']) * level
-    chakra = max(1, chakra)
-    
-    # Calcular CA: 10 + mod_destreza + metade do bônus de proficiência
-    proficiency_bonus = get_proficiency_bonus(level)
-    armor_class = 10 + modifiers['dexterity'] + (proficiency_bonus // 2)
-    
-    return {
-        'hp': hp,
-        'max_hp': hp,
-        'chakra': chakra,
-        'max_chakra': chakra,
-        'armor_class': armor_class,
-        'proficiency_bonus': proficiency_bonus,
-        'modifiers': modifiers
-    }
+async def save_character_update(character_id: str, update_data: dict) -> Optional[dict]:
+    """Grava o $set, registra o diff no histórico e invalida caches; None se não existir"""
+    result = await storage.characters.update(character_id, update_data)
+    return await record_character_write(result, update_data)
+
+async def record_character_write(result: Optional[UpdateResult], fields: dict) -> Optional[dict]:
+    """Registra o diff no histórico, republica a ficha pública e invalida caches após uma escrita"""
+    if result is None:
+        return None
+    
+    try:
+        await history.record_update(result, fields)
+    except Exception:
+        logger.exception("Falha ao registrar histórico: %s", result.after.get('id'))
+    
+    await publish_share_snapshot(result.after)
+    roster_cache.clear()
+    return result.after
+
+# Campos que não aparecem na ficha compartilhada
+SHARE_PRIVATE_FIELDS = {'id', 'notes', 'notes_count', 'extra_notes'}
 
+def render_share_snapshot(character: dict, catalog) -> bytes:
+    """Ficha pública desnormalizada: clã e classe resolvidos, campos privados removidos"""
+    character = migrate_character_data(dict(character))
+    public = Character(**character).model_dump(mode="json", exclude=SHARE_PRIVATE_FIELDS)
+    clan = catalog.rendered.get(f"clan:{public['clan_id']}")
+    char_class = catalog.rendered.get(f"class:{public['class_id']}")
+    public['clan'] = json.loads(clan) if clan else None
+    public['class'] = json.loads(char_class) if char_class else None
+    return json.dumps(public, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+async def publish_share_snapshot(character: dict) -> None:
+    """Grava a ficha pública pré-renderizada; uma falha aqui não desfaz a escrita"""
+    try:
+        catalog = content.current
+        body = render_share_snapshot(character, catalog)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        await storage.share_snapshots.put(
+            character['share_id'], character['id'], character.get('version', 1), catalog.etag, body, etag
+        )
+    except Exception:
+        logger.exception("Falha ao publicar ficha compartilhada: %s", character.get('id'))
 
 # Routes
 @api_router.get("/")
 async def root():
     return {"message": "Naruto RPG Character Creator API"}
 
+def catalog_response(request: Request, key: str) -> Response:
+    """Responde com o JSON pré-serializado do catálogo, validado por ETag"""
+    catalog = content.current
+    headers = {
+        "ETag": catalog.etag,
+        "X-Content-Version": catalog.version,
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalog.rendered[key], media_type="application/json", headers=headers)
+
 # Clan routes
 @api_router.get("/clans")
-async def get_clans():
+async def get_clans(request: Request):
     """Retorna todos os clãs disponíveis"""
-    return CLANS
+    return catalog_response(request, "clans")
 
 @api_router.get("/clans/{clan_id}")
-async def get_clan(clan_id: str):
+async def get_clan(clan_id: str, request: Request):
     """Retorna um clã específico"""
-    clan = next((c for c in CLANS if c['id'] == clan_id), None)
-    if not clan:
+    if not content.current.clan(clan_id):
         raise HTTPException(status_code=404, detail="Clã não encontrado")
-    return clan
+    return catalog_response(request, f"clan:{clan_id}")
 
 # Class routes
 @api_router.get("/classes")
-async def get_classes():
+async def get_classes(request: Request):
     """Retorna todas as classes disponíveis"""
-    return CLASSES
+    return catalog_response(request, "classes")
 
 @api_router.get("/classes/{class_id}")
-async def get_class(class_id: str):
+async def get_class(class_id: str, request: Request):
     """Retorna uma classe específica"""
-    char_class = next((c for c in CLASSES if c['id'] == class_id), None)
-    if not char_class:
+    if not content.current.char_class(class_id):
+        raise HTTPException(status_code=404, detail="Classe não encontrada")
+    return catalog_response(request, f"class:{class_id}")
+
+def character_filters(
+    name: Optional[str] = Query(None, description="Prefixo do nome"),
+    q: Optional[str] = Query(None, description="Busca textual em nome e título"),
+    clan_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    min_level: Optional[int] = Query(None, ge=1, le=20),
+    max_level: Optional[int] = Query(None, ge=1, le=20),
+    condition: Optional[str] = None,
+    rank: Optional[str] = None,
+) -> CharacterFilter:
+    """Filtros de busca comuns às rotas de listagem"""
+    return CharacterFilter(
+        name_prefix=name or None,
+        text=q or None,
+        clan_id=clan_id,
+        class_id=class_id,
+        min_level=min_level,
+        max_level=max_level,
+        condition=condition,
+        rank=rank,
+    )
+
+def build_progression(clan_id: str, class_id: str, attributes: dict) -> dict:
+    """Tabela de progressão 1-20 da build (HP, Chakra, CA, proficiência e XP por nível)"""
+    catalog = content.current
+    if not catalog.clan(clan_id):
+        raise HTTPException(status_code=404, detail="Clã não encontrado")
+    if not catalog.char_class(class_id):
         raise HTTPException(status_code=404, detail="Classe não encontrada")
-    return char_class
+    
+    return {
+        'clan_id': clan_id,
+        'class_id': class_id,
+        'content_version': catalog.version,
+        'levels': progression(catalog, clan_id, class_id, attributes),
+    }
+
+@api_router.post("/progression")
+async def get_progression(input: ProgressionRequest):
+    """Projeta a progressão de uma build do nível 1 ao 20"""
+    return build_progression(input.clan_id, input.class_id, input.attributes.model_dump())
 
 # Character routes
 @api_router.post("/characters", response_model=Character)
 async def create_character(input: CharacterCreate):
     """Cria um novo personagem"""
     # Validar clã e classe
-    clan = next((c for c in CLANS if c['id'] == input.clan_id), None)
-    if not clan:
+    catalog = content.current
+    if not catalog.clan(input.clan_id):
         raise HTTPException(status_code=404, detail="Clã não encontrado")
     
-    char_class = next((c for c in CLASSES if c['id'] == input.class_id), None)
-    if not char_class:
+    if not catalog.char_class(input.class_id):
         raise HTTPException(status_code=404, detail="Classe não encontrada")
     
     # Criar dicionário base
     char_dict = input.model_dump()
     
-    # Calcular estatísticas
-    stats = calculate_character_stats(char_dict, clan, char_class)
+    # Calcular estatísticas (com os bônus do clã)
+    stats = calculate_stats(catalog, input.clan_id, input.class_id, char_dict['attributes'])
     char_dict.update(stats)
     char_dict['level'] = 1
     char_dict['xp'] = 0
@@ -323,15 +628,26 @@ async def create_character(input: CharacterCreate):
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
     
-    await db.characters.insert_one(doc)
+    await storage.characters.insert(doc)
+    # O personagem já foi gravado: um 500 aqui liberaria a chave de idempotência e o retry o duplicaria
+    try:
+        await history.record_created(doc)
+    except Exception:
+        logger.exception("Falha ao registrar histórico: %s", doc['id'])
+    await publish_share_snapshot(doc)
     
-    logger.info(f"Personagem criado: {character.name} (ID: {character.id})")
+    roster_cache.clear()
+    logger.info("Personagem criado: %s (ID: %s)", character.name, character.id)
     return character
 
 @api_router.get("/characters", response_model=List[Character])
-async def get_characters():
-    """Lista todos os personagens"""
-    characters = await db.characters.find({}, {"_id": 0}).to_list(1000)
+async def get_characters(
+    filters: CharacterFilter = Depends(character_filters),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+):
+    """Lista os personagens (com filtros e paginação opcionais)"""
+    characters = await storage.characters.find(filters, skip=skip, limit=limit)
     
     # Converter timestamps e migrar formato
     for char in characters:
@@ -344,10 +660,100 @@ async def get_characters():
     
     return characters
 
+@api_router.get("/characters/search", response_model=List[CharacterSummary])
+async def search_characters(
+    filters: CharacterFilter = Depends(character_filters),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Busca personagens no servidor e retorna apenas resumos"""
+    characters = await storage.characters.find(filters, skip=skip, limit=limit, fields=SUMMARY_FIELDS)
+    
+    for char in characters:
+        if isinstance(char.get('updated_at'), str):
+            char['updated_at'] = datetime.fromisoformat(char['updated_at'])
+        if 'max_hp' not in char:
+            char['max_hp'] = char.get('hp', 0)
+        if 'max_chakra' not in char:
+            char['max_chakra'] = char.get('chakra', 0)
+    
+    return characters
+
+# Janela relida a cada sincronização: updated_at vem do handler (antes do commit, relógio de cada worker),
+# então uma escrita pode aparecer atrás da marca d'água até este prazo depois do seu timestamp
+SYNC_OVERLAP = float(os.environ.get('SYNC_OVERLAP', '30'))
+
+def encode_watermark(characters: Optional[tuple], tombstones: Optional[tuple], started_at: Optional[str]) -> str:
+    data = {"c": characters, "t": tombstones, "s": started_at}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+def _watermark_cursor(value: Any) -> Optional[tuple]:
+    if value is None:
+        return None
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(v, str) for v in value)):
+        raise ValueError("cursor inválido")
+    return tuple(value)
+
+def decode_watermark(watermark: str) -> tuple:
+    """(cursor de personagens, cursor de remoções, início da rodada em andamento ou None)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(watermark.encode()))
+        started_at = data.get("s")
+        if started_at is not None:
+            datetime.fromisoformat(started_at)
+        return _watermark_cursor(data["c"]), _watermark_cursor(data["t"]), started_at
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Marca d'água inválida")
+
+@api_router.get("/characters/sync", response_model=SyncResponse)
+async def sync_characters(
+    watermark: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """Personagens criados/alterados e removidos desde a marca d'água (sem ela, o elenco inteiro)"""
+    after_character, after_tombstone, started_at = decode_watermark(watermark) if watermark else (None, None, None)
+    # Uma rodada pode ter várias páginas; o início dela limita a marca d'água final
+    started_at = started_at or datetime.now(timezone.utc).isoformat()
+    
+    characters = await storage.characters.find_changed(after_character, limit=limit + 1)
+    tombstones = await storage.tombstones.list(after_tombstone, limit=limit + 1)
+    has_more = len(characters) > limit or len(tombstones) > limit
+    characters, tombstones = characters[:limit], tombstones[:limit]
+    
+    # A nova marca d'água aponta para o último item entregue de cada fluxo
+    if characters:
+        after_character = (characters[-1]['updated_at'], characters[-1]['id'])
+    if tombstones:
+        after_tombstone = (tombstones[-1]['deleted_at'], tombstones[-1]['id'])
+    
+    # Fim da rodada: a próxima relê a janela anterior ao início desta (o cliente mescla por id)
+    if not has_more:
+        floor = ((datetime.fromisoformat(started_at) - timedelta(seconds=SYNC_OVERLAP)).isoformat(), "")
+        if after_character is not None:
+            after_character = min(after_character, floor)
+        if after_tombstone is not None:
+            after_tombstone = min(after_tombstone, floor)
+    
+    # Converter timestamps e migrar formato
+    for char in characters:
+        if isinstance(char.get('created_at'), str):
+            char['created_at'] = datetime.fromisoformat(char['created_at'])
+        if isinstance(char.get('updated_at'), str):
+            char['updated_at'] = datetime.fromisoformat(char['updated_at'])
+        
+        migrate_character_data(char)
+    
+    return {
+        "characters": characters,
+        "deleted": [t['id'] for t in tombstones],
+        "watermark": encode_watermark(after_character, after_tombstone, started_at if has_more else None),
+        "has_more": has_more,
+    }
+
 @api_router.get("/characters/{character_id}", response_model=Character)
 async def get_character(character_id: str):
     """Busca um personagem específico"""
-    character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+    character = await storage.characters.get(character_id)
     
     if not character:
         raise HTTPException(status_code=404, detail="Personagem não encontrado")
@@ -365,7 +771,7 @@ async def get_character(character_id: str):
 @api_router.put("/characters/{character_id}", response_model=Character)
 async def update_character(character_id: str, input: CharacterUpdate):
     """Atualiza um personagem existente"""
-    character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+    character = await storage.characters.get(character_id)
     
     if not character:
         raise HTTPException(status_code=404, detail="Personagem não encontrado")
@@ -381,36 +787,33 @@ async def update_character(character_id: str, input: CharacterUpdate):
             manual_override = True
         
         if not manual_override:
-            clan = next((c for c in CLANS if c['id'] == character['clan_id']), None)
-            char_class = next((c for c in CLASSES if c['id'] == character['class_id']), None)
-            
-            temp_char = {**character, **update_data}
             new_level = update_data.get('level', character.get('level', 1))
-            stats = calculate_character_stats(temp_char, clan, char_class, new_level)
-            
-            # Só atualiza stats que não foram editados manualmente
-            if 'hp' not in update_data:
-                update_data['hp'] = stats['hp']
-                update_data['max_hp'] = stats['max_hp']
-            if 'chakra' not in update_data:
-                update_data['chakra'] = stats['chakra']
-                update_data['max_chakra'] = stats['max_chakra']
-            if 'armor_class' not in update_data:
-                update_data['armor_class'] = stats['armor_class']
-            if 'proficiency_bonus' not in update_data:
-                update_data['proficiency_bonus'] = stats['proficiency_bonus']
+            attributes = update_data.get('attributes', character['attributes'])
+            stats = calculate_stats(content.current, character['clan_id'], character['class_id'], attributes, new_level)
             
-            update_data['modifiers'] = stats['modifiers']
+            # Clã ou classe fora do catálogo atual: mantém os valores gravados
+            if stats:
+                # Só atualiza stats que não foram editados manualmente
+                if 'hp' not in update_data:
+                    update_data['hp'] = stats['hp']
+                    update_data['max_hp'] = stats['max_hp']
+                if 'chakra' not in update_data:
+                    update_data['chakra'] = stats['chakra']
+                    update_data['max_chakra'] = stats['max_chakra']
+                if 'armor_class' not in update_data:
+                    update_data['armor_class'] = stats['armor_class']
+                if 'proficiency_bonus' not in update_data:
+                    update_data['proficiency_bonus'] = stats['proficiency_bonus']
+                
+                update_data['modifiers'] = stats['modifiers']
     
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
     
-    await db.characters.update_one(
-        {"id": character_id},
-        {"$set": update_data}
-    )
+    # Atualiza e devolve o personagem atualizado
+    updated_character = await save_character_update(character_id, update_data)
     
-    # Buscar personagem atualizado
-    updated_character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+    if not updated_character:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
     # Converter timestamps
     if isinstance(updated_character.get('created_at'), str):
@@ -418,48 +821,57 @@ async def update_character(character_id: str, input: CharacterUpdate):
     if isinstance(updated_character.get('updated_at'), str):
         updated_character['updated_at'] = datetime.fromisoformat(updated_character['updated_at'])
     
-    logger.info(f"Personagem atualizado: {character_id}")
+    logger.info("Personagem atualizado: %s", character_id)
     return updated_character
 
 @api_router.delete("/characters/{character_id}")
 async def delete_character(character_id: str):
     """Deleta um personagem"""
-    result = await db.characters.delete_one({"id": character_id})
+    character = await storage.characters.get(character_id)
+    deleted = character is not None and await storage.characters.delete(character_id)
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
-    logger.info(f"Personagem deletado: {character_id}")
+    await storage.notes.delete_for_character(character_id)
+    # Marca de remoção: uma escrita em andamento não republica a ficha depois daqui
+    await storage.share_snapshots.delete(character['share_id'], character_id)
+    await storage.tombstones.add(character_id, datetime.now(timezone.utc).isoformat())
+    roster_cache.clear()
+    logger.info("Personagem deletado: %s", character_id)
     return {"message": "Personagem deletado com sucesso"}
 
-@api_router.get("/characters/share/{share_id}", response_model=Character)
-async def get_shared_character(share_id: str):
-    """Busca um personagem compartilhado via share_id"""
-    character = await db.characters.find_one({"share_id": share_id}, {"_id": 0})
-    
-    if not character:
-        raise HTTPException(status_code=404, detail="Personagem não encontrado")
-    
-    # Converter timestamps
-    if isinstance(character.get('created_at'), str):
-        character['created_at'] = datetime.fromisoformat(character['created_at'])
-    if isinstance(character.get('updated_at'), str):
-        character['updated_at'] = datetime.fromisoformat(character['updated_at'])
-    
-    migrate_character_data(character)
-    
-    return character
+@api_router.get("/characters/share/{share_id}")
+async def get_shared_character(share_id: str, request: Request):
+    """Retorna a ficha pública pré-renderizada via share_id, validada por ETag"""
+    snapshot = await storage.share_snapshots.get(share_id)
+    
+    # Fichas ausentes (personagens antigos) são publicadas no acesso; a troca de pacote republica todas
+    if snapshot is None:
+        character = await storage.characters.get_by_share_id(share_id)
+        if not character:
+            raise HTTPException(status_code=404, detail="Personagem não encontrado")
+        await publish_share_snapshot(character)
+        snapshot = await storage.share_snapshots.get(share_id)
+        if snapshot is None:
+            raise HTTPException(status_code=500, detail="Falha ao publicar ficha compartilhada")
+    
+    headers = {"ETag": snapshot['etag'], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot['etag']:
+        return Response(status_code=304, headers=headers)
+    return Response(content=bytes(snapshot['body']), media_type="application/json", headers=headers)
 
 @api_router.put("/characters/{character_id}/xp", response_model=Character)
 async def update_character_xp(character_id: str, input: XPUpdate):
     """Atualiza XP do personagem e recalcula nível se necessário"""
-    character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+    character = await storage.characters.get(character_id)
     
     if not character:
         raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
     new_xp = input.xp
-    new_level = get_level_from_xp(new_xp)
+    catalog = content.current
+    new_level = catalog.level_from_xp(new_xp)
     old_level = character.get('level', 1)
     
     update_data = {
@@ -470,15 +882,11 @@ async def update_character_xp(character_id: str, input: XPUpdate):
     # Se o nível mudou, recalcular stats
     if new_level != old_level:
         update_data['level'] = new_level
-        update_data['proficiency_bonus'] = get_proficiency_bonus(new_level)
+        update_data['proficiency_bonus'] = catalog.proficiency_bonus(new_level)
         
-        clan = next((c for c in CLANS if c['id'] == character['clan_id']), None)
-        char_class = next((c for c in CLASSES if c['id'] == character['class_id']), None)
+        stats = calculate_stats(catalog, character['clan_id'], character['class_id'], character['attributes'], new_level)
         
-        if clan and char_class:
-            temp_char = {**character, 'level': new_level}
-            stats = calculate_character_stats(temp_char, clan, char_class, new_level)
-            
+        if stats:
             # Atualizar max_hp e max_chakra
             update_data['max_hp'] = stats['max_hp']
             update_data['max_chakra'] = stats['max_chakra']
@@ -492,13 +900,11 @@ async def update_character_xp(character_id: str, input: XPUpdate):
             update_data['armor_class'] = stats['armor_class']
             update_data['modifiers'] = stats['modifiers']
     
-    await db.characters.update_one(
-        {"id": character_id},
-        {"$set": update_data}
-    )
+    # Atualiza e devolve o personagem atualizado
+    updated_character = await save_character_update(character_id, update_data)
     
-    # Buscar personagem atualizado
-    updated_character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+    if not updated_character:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
     # Converter timestamps e migrar
     if isinstance(updated_character.get('created_at'), str):
@@ -508,17 +914,194 @@ async def update_character_xp(character_id: str, input: XPUpdate):
     
     migrate_character_data(updated_character)
     
-    logger.info(f"XP atualizado: {character_id}, Nível: {new_level}")
+    logger.info("XP atualizado: %s, Nível: %d", character_id, new_level)
     return updated_character
 
-@api_router.patch("/characters/{character_id}/quick-stats")
-async def update_quick_stats(character_id: str, input: QuickStatsUpdate):
-    """Atualiza HP e/ou Chakra rapidamente"""
-    character = await db.characters.find_one({"id": character_id}, {"_id": 0})
+def encode_note_cursor(note: dict) -> str:
+    return base64.urlsafe_b64encode(f"{note['created_at']}|{note['id']}".encode()).decode()
+
+def decode_note_cursor(cursor: str) -> tuple:
+    try:
+        created_at, note_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return created_at, note_id
+
+async def refresh_notes_preview(character_id: str, count_delta: int, updated_at: str) -> None:
+    """Regrava as notas recentes do personagem após editar ou remover uma nota"""
+    latest = await storage.notes.list(character_id, limit=NOTES_PREVIEW)
+    await storage.characters.refresh_notes(character_id, latest[::-1], count_delta, updated_at)
+
+@api_router.get("/characters/{character_id}/notes", response_model=NotePage)
+async def list_character_notes(
+    character_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """Lista as notas do personagem (mais recentes primeiro, paginação por cursor)"""
+    before = decode_note_cursor(cursor) if cursor else None
+    notes = await storage.notes.list(character_id, limit=limit + 1, before=before)
+    
+    next_cursor = encode_note_cursor(notes[limit - 1]) if len(notes) > limit else None
+    return {"notes": notes[:limit], "next_cursor": next_cursor}
+
+@api_router.post("/characters/{character_id}/notes", response_model=Note)
+async def add_character_note(character_id: str, input: NoteInput):
+    """Adiciona uma nota sem reescrever o personagem"""
+    note = Note(content=input.content)
+    doc = note.model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    
+    await storage.notes.add({**doc, 'character_id': character_id})
+    pushed = await storage.characters.push_note(character_id, doc, NOTES_PREVIEW, doc['created_at'])
+    
+    if not pushed:
+        await storage.notes.delete(character_id, note.id)
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
+    
+    return note
+
+@api_router.patch("/characters/{character_id}/notes/{note_id}", response_model=Note)
+async def update_character_note(character_id: str, note_id: str, input: NoteInput):
+    """Edita o conteúdo de uma nota"""
+    updated_at = datetime.now(timezone.utc).isoformat()
+    note = await storage.notes.update(character_id, note_id, input.content, updated_at)
+    
+    if not note:
+        raise HTTPException(status_code=404, detail="Nota não encontrada")
+    
+    await refresh_notes_preview(character_id, 0, updated_at)
+    return note
+
+@api_router.delete("/characters/{character_id}/notes/{note_id}")
+async def delete_character_note(character_id: str, note_id: str):
+    """Remove uma nota"""
+    deleted = await storage.notes.delete(character_id, note_id)
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Nota não encontrada")
+    
+    await refresh_notes_preview(character_id, -1, datetime.now(timezone.utc).isoformat())
+    return {"message": "Nota removida com sucesso"}
+
+@api_router.patch("/characters/{character_id}/items")
+async def update_character_items(character_id: str, input: ItemBatch):
+    """Aplica um lote de operações em equipamentos, armas e jutsus em uma única escrita"""
+    operations = []
+    for item_op in input.operations:
+        if item_op.op == "add":
+            if item_op.target == "jutsus":
+                item = {"name": item_op.name, "details": item_op.details}
+            elif item_op.quantity < 1:
+                raise HTTPException(status_code=400, detail="Quantidade inicial deve ser positiva")
+            else:
+                item = {"name": item_op.name, "quantity": item_op.quantity}
+            operations.append(ItemOperation("add", item_op.target, item_op.name, item=item))
+        elif item_op.op == "remove":
+            operations.append(ItemOperation("remove", item_op.target, item_op.name))
+        else:
+            if item_op.target == "jutsus":
+                raise HTTPException(status_code=400, detail="Jutsus não têm quantidade")
+            operations.append(ItemOperation("quantity", item_op.target, item_op.name, delta=item_op.quantity))
+    
+    updated_at = datetime.now(timezone.utc).isoformat()
+    try:
+        result = await storage.characters.update_items(character_id, operations, updated_at)
+    except ItemNotFoundError as e:
+        # Nada foi gravado: sem versão nova, histórico ou republicação
+        raise HTTPException(status_code=404, detail=f"Item não encontrado: {e}")
+    
+    # Só as listas alteradas entram no histórico e na resposta
+    touched = {op.field for op in operations}
+    fields = {field: result.after.get(field, []) for field in touched} if result else {}
+    updated = await record_character_write(result, {**fields, 'updated_at': updated_at})
+    
+    if not updated:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
+    
+    return {**fields, 'version': updated['version'], 'updated_at': updated_at}
+
+@api_router.get("/characters/{character_id}/progression")
+async def get_character_progression(character_id: str):
+    """Projeta a progressão do personagem do nível 1 ao 20"""
+    character = await storage.characters.get(character_id)
     
     if not character:
         raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
+    return build_progression(character['clan_id'], character['class_id'], character['attributes'])
+
+@api_router.get("/characters/{character_id}/history")
+async def get_character_history(
+    character_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Lista as alterações do personagem (mais recentes primeiro)"""
+    return await storage.history.list(character_id, skip=skip, limit=limit)
+
+@api_router.get("/characters/{character_id}/history/state", response_model=Character)
+async def get_character_state(
+    character_id: str,
+    version: Optional[int] = Query(None, ge=0),
+    at: Optional[datetime] = None,
+):
+    """Reconstrói o personagem em uma versão ou instante do histórico"""
+    if version is None and at is None:
+        raise HTTPException(status_code=400, detail="Informe version ou at")
+    
+    state = await history.state_at(character_id, version=version, until=at)
+    
+    if not state:
+        raise HTTPException(status_code=404, detail="Versão não encontrada no histórico")
+    
+    # Converter timestamps e migrar
+    if isinstance(state.get('created_at'), str):
+        state['created_at'] = datetime.fromisoformat(state['created_at'])
+    if isinstance(state.get('updated_at'), str):
+        state['updated_at'] = datetime.fromisoformat(state['updated_at'])
+    
+    migrate_character_data(state)
+    
+    return state
+
+@api_router.post("/characters/{character_id}/restore", response_model=Character)
+async def restore_character(character_id: str, input: RestoreRequest):
+    """Restaura o personagem para uma versão ou instante (gera uma nova versão)"""
+    if input.version is None and input.at is None:
+        raise HTTPException(status_code=400, detail="Informe version ou at")
+    
+    state = await history.state_at(character_id, version=input.version, until=input.at)
+    
+    if not state:
+        raise HTTPException(status_code=404, detail="Versão não encontrada no histórico")
+    
+    # Identidade e metadados não são restaurados
+    update_data = {
+        k: v for k, v in state.items()
+        if k not in ('id', 'share_id', 'created_at', 'updated_at', 'version', 'notes', 'notes_count')
+    }
+    update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    
+    restored = await save_character_update(character_id, update_data)
+    
+    if not restored:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
+    
+    # Converter timestamps e migrar
+    if isinstance(restored.get('created_at'), str):
+        restored['created_at'] = datetime.fromisoformat(restored['created_at'])
+    if isinstance(restored.get('updated_at'), str):
+        restored['updated_at'] = datetime.fromisoformat(restored['updated_at'])
+    
+    migrate_character_data(restored)
+    
+    logger.info("Personagem restaurado: %s, versão %s", character_id, state.get('version'))
+    return restored
+
+@api_router.patch("/characters/{character_id}/quick-stats")
+async def update_quick_stats(character_id: str, input: QuickStatsUpdate):
+    """Atualiza HP e/ou Chakra rapidamente"""
     update_data = {'updated_at': datetime.now(timezone.utc).isoformat()}
     
     if input.hp is not None:
@@ -526,10 +1109,9 @@ async def update_quick_stats(character_id: str, input: QuickStatsUpdate):
     if input.chakra is not None:
         update_data['chakra'] = max(0, input.chakra)
     
-    await db.characters.update_one(
-        {"id": character_id},
-        {"$set": update_data}
-    )
+    # Uma única escrita; a ausência do personagem é detectada pelo próprio update
+    if not await save_character_update(character_id, update_data):
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     
     return {"success": True, "message": "Stats atualizados"}
 
@@ -555,21 +1137,109 @@ async def roll_dice(dice_type: str = "d6", count: int = 1):
     }
 
 @api_router.get("/conditions")
-async def get_conditions():
+async def get_conditions(request: Request):
     """Retorna a lista de condições disponíveis"""
-    from data.conditions import CONDITIONS
-    return CONDITIONS
+    return catalog_response(request, "conditions")
 
 @api_router.get("/xp-table")
-async def get_xp_table():
+async def get_xp_table(request: Request):
     """Retorna a tabela de XP por nível"""
-    from data.clans import XP_TABLE
-    return XP_TABLE
+    return catalog_response(request, "xp_table")
+
+@api_router.get("/content/version")
+async def get_content_version():
+    """Retorna a versão do pacote de conteúdo carregado"""
+    catalog = content.current
+    return {
+        "version": catalog.version,
+        "etag": catalog.etag,
+        "loaded_at": catalog.loaded_at.isoformat()
+    }
+
+@api_router.post("/admin/content/reload")
+async def reload_content(x_admin_token: Optional[str] = Header(None)):
+    """Recarrega o pacote de conteúdo sem reiniciar o processo"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Recarga administrativa desabilitada")
+    if not hmac.compare_digest((x_admin_token or '').encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Token administrativo inválido")
+    
+    try:
+        catalog = await content.reload()
+    except (ContentPackError, OSError) as e:
+        # O catálogo anterior continua ativo
+        raise HTTPException(status_code=422, detail=f"Pacote de conteúdo inválido: {e}")
+    
+    logger.info("Conteúdo recarregado: versão %s", catalog.version)
+    await _announce_content(catalog)
+    return {"version": catalog.version, "etag": catalog.etag}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expõe as métricas no formato texto do Prometheus"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@api_router.get("/health/live")
+async def health_live():
+    """Liveness: o processo está respondendo"""
+    return {"status": "ok"}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    """Readiness: o banco responde (resultado do ping em cache)"""
+    ready = await readiness.status()
+    body = {
+        "status": "ready" if ready else "unavailable",
+        "storage": storage.name,
+        "content_version": content.current.version
+    }
+    if not ready:
+        body["error"] = readiness.error
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@api_router.get("/analytics/roster")
+async def get_roster_analytics():
+    """Retorna agregações do elenco calculadas no banco (com cache curto)"""
+    cached = roster_cache.get("roster")
+    if cached is not None:
+        return cached
+    
+    stats = await storage.characters.roster_stats()
+    
+    # Todas as condições aparecem, mesmo sem personagens
+    counts = {item['condition']: item['count'] for item in stats['by_condition']}
+    stats['by_condition'] = [{"condition": c, "count": counts.pop(c, 0)} for c in content.current.conditions]
+    stats['by_condition'].extend({"condition": c, "count": n} for c, n in counts.items())
+    
+    stats['generated_at'] = datetime.now(timezone.utc).isoformat()
+    roster_cache.set("roster", stats)
+    return stats
 
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Escritas com Idempotency-Key devolvem a resposta gravada nas repetições
+app.add_middleware(
+    IdempotencyMiddleware,
+    repository=storage.idempotency,
+    ttl=float(os.environ.get('IDEMPOTENCY_TTL', '86400')),
+    lease=float(os.environ.get('IDEMPOTENCY_LEASE', '30')),
+)
+
+# Limite de taxa por cliente e por personagem (dentro do CORS para o 429 ser legível no navegador)
+app.add_middleware(
+    RateLimitMiddleware,
+    limits=routes_from_env(os.environ),
+    store=rate_limit_store,
+    proxy_hops=int(os.environ.get('RATE_LIMIT_PROXY_HOPS', '0')),
+    trusted_proxies=parse_networks(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '')),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -578,6 +1248,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+# Métricas por rota (mais externo para medir também o CORS)
+app.add_middleware(MetricsMiddleware)
+
+# Id de requisição e log de acesso; rotas de alto volume são amostradas
+app.add_middleware(
+    RequestLogMiddleware,
+    sample_rates={
+        "/api/characters/{character_id}/quick-stats": float(os.environ.get('QUICK_STATS_LOG_SAMPLE_RATE', '0.1')),
+    },
+    slow_threshold=float(os.environ.get('SLOW_REQUEST_LOG_THRESHOLD', '1.0')),
+)
@@ -0,0 +1,46 @@
+# Camada de persistência plugável
+import os
+from pathlib import Path
+
+from storage.base import (
+    ITEM_FIELDS, CharacterFilter, CharacterRepository, HistoryRepository, IdempotencyRepository, ItemNotFoundError,
+    ItemOperation, NoteRepository, SettingRepository, ShareSnapshotRepository, Storage, TombstoneRepository, UpdateResult
+)
+
+__all__ = [
+    "ITEM_FIELDS", "CharacterFilter", "CharacterRepository", "HistoryRepository", "IdempotencyRepository",
+    "ItemNotFoundError", "ItemOperation", "NoteRepository", "SettingRepository", "ShareSnapshotRepository", "Storage",
+    "TombstoneRepository", "UpdateResult", "create_storage"
+]
+
+
+def create_storage() -> Storage:
+    """Cria o backend escolhido por STORAGE_BACKEND (mongo, memory ou sqlite)"""
+    backend = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+
+    if backend == 'mongo':
+        from storage.mongo import MongoStorage
+        min_pool_size = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+        options = {
+            'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+            'minPoolSize': min_pool_size,
+            'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000')),
+            'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+            'connectTimeoutMS': int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+            'waitQueueTimeoutMS': int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+        }
+        if os.environ.get('MONGO_SOCKET_TIMEOUT_MS'):
+            options['socketTimeoutMS'] = int(os.environ['MONGO_SOCKET_TIMEOUT_MS'])
+        warm_connections = int(os.environ.get('MONGO_WARM_CONNECTIONS', str(min_pool_size)))
+        return MongoStorage(os.environ['MONGO_URL'], os.environ['DB_NAME'], warm_connections, **options)
+
+    if backend == 'memory':
+        from storage.memory import MemoryStorage
+        return MemoryStorage()
+
+    if backend == 'sqlite':
+        from storage.sqlite import SqliteStorage
+        default_path = Path(__file__).parent.parent / 'naruto_rpg.db'
+        return SqliteStorage(os.environ.get('SQLITE_PATH', str(default_path)))
+
+    raise ValueError(f"STORAGE_BACKEND inválido: {backend}")
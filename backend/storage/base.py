@@ -0,0 +1,326 @@
+# Interfaces da camada de persistência
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class CharacterFilter:
+    """Filtros da busca de personagens (campos None são ignorados)"""
+    name_prefix: Optional[str] = None
+    # Busca em nome e título: todos os termos, palavras inteiras, sem diferenciar maiúsculas e acentos
+    text: Optional[str] = None
+    clan_id: Optional[str] = None
+    class_id: Optional[str] = None
+    min_level: Optional[int] = None
+    max_level: Optional[int] = None
+    condition: Optional[str] = None
+    rank: Optional[str] = None
+
+
+def project(doc: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Aplica uma projeção com caminhos pontuados (como no MongoDB)"""
+    if fields is None:
+        return doc
+    result: Dict[str, Any] = {}
+    for field in fields:
+        source, target = doc, result
+        parts = field.split(".")
+        for part in parts[:-1]:
+            source = source.get(part) if isinstance(source, dict) else None
+            if source is None:
+                break
+            target = target.setdefault(part, {})
+        else:
+            if isinstance(source, dict) and parts[-1] in source:
+                target[parts[-1]] = source[parts[-1]]
+    return result
+
+
+@dataclass
+class UpdateResult:
+    """Estado do personagem antes e depois de uma escrita"""
+    before: Dict[str, Any]
+    after: Dict[str, Any]
+
+
+# Listas do personagem editáveis item a item
+ITEM_FIELDS = ("equipment", "weapons", "jutsus")
+# Listas cujos itens têm quantidade (jutsus não têm)
+QUANTITY_FIELDS = ("equipment", "weapons")
+
+
+class ItemNotFoundError(LookupError):
+    """Remoção ou alteração de quantidade de um item que o personagem não tem"""
+
+
+@dataclass
+class ItemOperation:
+    """Operação sobre um item, identificado pelo nome: add (soma a quantidade se já existe), remove ou quantity"""
+    op: str
+    field: str
+    name: str
+    item: Optional[Dict[str, Any]] = None
+    delta: int = 0
+
+
+def required_items(operations: Sequence[ItemOperation]) -> List[Tuple[str, str]]:
+    """(lista, nome) que precisam existir antes do lote: alvos de remove/quantity não adicionados antes nele"""
+    added, required = set(), []
+    for operation in operations:
+        key = (operation.field, operation.name)
+        if operation.op == "add":
+            added.add(key)
+        elif key not in added and key not in required:
+            required.append(key)
+    return required
+
+
+def _named(item: Any, name: str) -> bool:
+    return isinstance(item, dict) and item.get("name") == name
+
+
+def _merge_duplicates(items: List[Any], names: List[str], quantities: bool) -> List[Any]:
+    """Junta itens repetidos dos nomes dados no primeiro deles, somando as quantidades"""
+    result: List[Any] = []
+    for item in items:
+        if isinstance(item, dict) and item.get("name") in names:
+            first = next((kept for kept in result if _named(kept, item["name"])), None)
+            if first is not None:
+                if quantities:
+                    first["quantity"] = first.get("quantity", 1) + item.get("quantity", 1)
+                continue
+        result.append(item)
+    return result
+
+
+def apply_item_operations(doc: Dict[str, Any], operations: Sequence[ItemOperation]) -> None:
+    """Aplica as operações no documento com a mesma semântica do pipeline de atualização do MongoDB"""
+    # Nada é alterado se falta um item a remover ou alterar
+    for field, name in required_items(operations):
+        if not any(_named(i, name) for i in doc.get(field) or []):
+            raise ItemNotFoundError(f"{field}: {name}")
+
+    # Duplicatas antigas dos nomes tocados viram um item só antes das operações
+    touched: Dict[str, List[str]] = {}
+    for operation in operations:
+        touched.setdefault(operation.field, []).append(operation.name)
+    for field, names in touched.items():
+        doc[field] = _merge_duplicates(doc.get(field) or [], names, field in QUANTITY_FIELDS)
+
+    for operation in operations:
+        items = doc[operation.field]
+        name = operation.name
+        if operation.op == "add":
+            if not any(_named(i, name) for i in items):
+                items.append(dict(operation.item))
+            elif operation.field in QUANTITY_FIELDS:
+                quantity = operation.item.get("quantity", 1)
+                for item in items:
+                    if _named(item, name):
+                        item["quantity"] = item.get("quantity", 1) + quantity
+            else:
+                doc[operation.field] = [{**i, **operation.item} if _named(i, name) else i for i in items]
+        elif operation.op == "remove":
+            doc[operation.field] = [i for i in items if not _named(i, name)]
+        elif operation.op == "quantity":
+            # Itens zerados são removidos
+            for item in items:
+                if _named(item, name):
+                    item["quantity"] = item.get("quantity", 1) + operation.delta
+            doc[operation.field] = [i for i in items if not (_named(i, name) and i["quantity"] <= 0)]
+
+
+def empty_roster_stats() -> Dict[str, Any]:
+    return {"total": 0, "by_clan": [], "by_class": [], "by_level": [], "by_condition": [], "class_averages": []}
+
+
+class CharacterRepository(ABC):
+    """Persistência de personagens (documentos no formato salvo no MongoDB, sem _id)"""
+
+    @abstractmethod
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        """Insere um novo personagem"""
+
+    @abstractmethod
+    async def get(self, character_id: str) -> Optional[Dict[str, Any]]:
+        """Busca um personagem pelo id"""
+
+    @abstractmethod
+    async def get_by_share_id(self, share_id: str) -> Optional[Dict[str, Any]]:
+        """Busca um personagem pelo share_id"""
+
+    @abstractmethod
+    async def find(self, filters: Optional[CharacterFilter] = None, skip: int = 0, limit: int = 1000,
+                   fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Lista personagens filtrados, paginados em ordem de inserção"""
+
+    @abstractmethod
+    async def find_changed(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """Personagens ordenados por (updated_at, id), a partir do cursor after (exclusivo)"""
+
+    @abstractmethod
+    async def update(self, character_id: str, fields: Dict[str, Any]) -> Optional[UpdateResult]:
+        """Aplica os campos ($set), incrementa version e retorna o antes e o depois"""
+
+    @abstractmethod
+    async def update_items(self, character_id: str, operations: Sequence[ItemOperation],
+                           updated_at: str) -> Optional[UpdateResult]:
+        """Aplica as operações em uma escrita e incrementa version (ItemNotFoundError se falta um alvo)"""
+
+    @abstractmethod
+    async def delete(self, character_id: str) -> bool:
+        """Remove um personagem; retorna False se não existir"""
+
+    @abstractmethod
+    async def push_note(self, character_id: str, note: Dict[str, Any], preview_size: int, updated_at: str) -> bool:
+        """Acrescenta a nota à prévia (mantendo as últimas preview_size) e incrementa notes_count"""
+
+    @abstractmethod
+    async def refresh_notes(self, character_id: str, preview: List[Dict[str, Any]], count_delta: int,
+                            updated_at: Optional[str] = None) -> bool:
+        """Substitui a prévia de notas e soma count_delta a notes_count"""
+
+    @abstractmethod
+    async def migrate_notes(self, character_id: str, preview: List[Dict[str, Any]], count: int) -> bool:
+        """Grava a prévia e notes_count=count só se notes_count ainda não existir (migração idempotente)"""
+
+    @abstractmethod
+    async def find_without_notes_count(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Personagens no formato antigo (notas embutidas, sem notes_count)"""
+
+    @abstractmethod
+    async def roster_stats(self) -> Dict[str, Any]:
+        """Agregações do elenco: contagens por clã, classe, nível e condição e médias por classe"""
+
+
+class HistoryRepository(ABC):
+    """Histórico de alterações: um diff por escrita e checkpoints periódicos"""
+
+    @abstractmethod
+    async def append(self, entry: Dict[str, Any]) -> None:
+        """Grava uma entrada (character_id, version, timestamp, changes, checkpoint)"""
+
+    @abstractmethod
+    async def latest_checkpoint(self, character_id: str, version: Optional[int] = None,
+                                until: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Último checkpoint com version <= version e timestamp <= until"""
+
+    @abstractmethod
+    async def entries_after(self, character_id: str, after_version: int, version: Optional[int] = None,
+                            until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entradas posteriores a after_version, em ordem crescente de versão"""
+
+    @abstractmethod
+    async def list(self, character_id: str, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Entradas mais recentes primeiro, sem o conteúdo dos checkpoints"""
+
+
+class NoteRepository(ABC):
+    """Notas dos personagens em coleção própria, paginadas por (created_at, id)"""
+
+    @abstractmethod
+    async def add(self, note: Dict[str, Any]) -> None:
+        """Insere uma nota (character_id, id, content, created_at)"""
+
+    @abstractmethod
+    async def add_many(self, notes: List[Dict[str, Any]]) -> None:
+        """Insere várias notas ignorando ids já existentes"""
+
+    @abstractmethod
+    async def update(self, character_id: str, note_id: str, content: str, updated_at: str) -> Optional[Dict[str, Any]]:
+        """Edita o conteúdo de uma nota e retorna a nota atualizada"""
+
+    @abstractmethod
+    async def delete(self, character_id: str, note_id: str) -> bool:
+        """Remove uma nota"""
+
+    @abstractmethod
+    async def delete_for_character(self, character_id: str) -> None:
+        """Remove todas as notas de um personagem"""
+
+    @abstractmethod
+    async def list(self, character_id: str, limit: int = 20,
+                   before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """Notas mais recentes primeiro; before é o cursor (created_at, id) da última nota vista"""
+
+
+class TombstoneRepository(ABC):
+    """Registros de personagens removidos, para a sincronização incremental"""
+
+    @abstractmethod
+    async def add(self, character_id: str, deleted_at: str) -> None:
+        """Registra a remoção de um personagem"""
+
+    @abstractmethod
+    async def list(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """Remoções ordenadas por (deleted_at, id), a partir do cursor after (exclusivo)"""
+
+
+class IdempotencyRepository(ABC):
+    """Respostas gravadas por Idempotency-Key, com expiração"""
+
+    @abstractmethod
+    async def reserve(self, key: str, fingerprint: str, owner: str, expires_at: datetime,
+                      locked_until: datetime) -> Optional[Dict[str, Any]]:
+        """Reserva a chave para owner até locked_until; com resposta gravada ou reserva ativa, retorna o registro"""
+
+    @abstractmethod
+    async def complete(self, key: str, owner: str, status_code: int, content_type: str, body: bytes) -> None:
+        """Grava a resposta, se a reserva ainda for de owner"""
+
+    @abstractmethod
+    async def release(self, key: str, owner: str) -> None:
+        """Libera a reserva de owner (a requisição falhou e pode ser refeita)"""
+
+
+class ShareSnapshotRepository(ABC):
+    """Fichas públicas pré-renderizadas (JSON + ETag), indexadas por share_id"""
+
+    @abstractmethod
+    async def put(self, share_id: str, character_id: str, version: int, content_etag: str,
+                  body: bytes, etag: str) -> None:
+        """Grava a ficha; não sobrescreve uma versão mais nova do personagem nem a marca de remoção"""
+
+    @abstractmethod
+    async def get(self, share_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna {body, etag, content_etag} da ficha publicada (None se ausente ou removida)"""
+
+    @abstractmethod
+    async def delete(self, share_id: str, character_id: str) -> None:
+        """Troca a ficha por uma marca de remoção: um put atrasado não a publica de novo"""
+
+
+class SettingRepository(ABC):
+    """Valores compartilhados entre os workers (ex.: o pacote de conteúdo ativo)"""
+
+    @abstractmethod
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Retorna o valor gravado em name"""
+
+    @abstractmethod
+    async def put(self, name: str, value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Grava o valor e retorna o anterior"""
+
+
+class Storage(ABC):
+    """Agrupa os repositórios de um backend e o seu ciclo de vida"""
+
+    name: str
+    characters: CharacterRepository
+    history: HistoryRepository
+    notes: NoteRepository
+    tombstones: TombstoneRepository
+    idempotency: IdempotencyRepository
+    share_snapshots: ShareSnapshotRepository
+    settings: SettingRepository
+
+    async def init(self) -> None:
+        """Conecta e prepara o backend (índices, tabelas); chamado no lifespan"""
+
+    async def ping(self) -> None:
+        """Verifica se o backend responde; lança exceção se não"""
+
+    async def close(self) -> None:
+        """Libera conexões do backend"""
@@ -0,0 +1,360 @@
+# Backend em memória (testes e benchmarks)
+import copy
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from storage.base import (
+    CharacterFilter, CharacterRepository, HistoryRepository, IdempotencyRepository, ItemOperation, NoteRepository,
+    SettingRepository, ShareSnapshotRepository, Storage, TombstoneRepository, UpdateResult, apply_item_operations,
+    empty_roster_stats, project
+)
+
+
+def words(text: str) -> List[str]:
+    """Palavras sem acentos e em minúsculas (como o tokenizador unicode61 do FTS5)"""
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return re.findall(r"\w+", text.casefold())
+
+
+def matches(doc: Dict[str, Any], filters: CharacterFilter) -> bool:
+    """Avalia os filtros de busca sobre um documento"""
+    if filters.clan_id and doc.get("clan_id") != filters.clan_id:
+        return False
+    if filters.class_id and doc.get("class_id") != filters.class_id:
+        return False
+    level = doc.get("level", 1)
+    if filters.min_level is not None and level < filters.min_level:
+        return False
+    if filters.max_level is not None and level > filters.max_level:
+        return False
+    if filters.condition and doc.get("condition", "Normal") != filters.condition:
+        return False
+    description = doc.get("description") or {}
+    if filters.rank and description.get("rank") != filters.rank:
+        return False
+    name = doc.get("name", "").casefold()
+    if filters.name_prefix and not name.startswith(filters.name_prefix.casefold()):
+        return False
+    if filters.text:
+        haystack = set(words(f"{name} {description.get('title', '')}"))
+        if not all(term in haystack for term in words(filters.text)):
+            return False
+    return True
+
+
+class MemoryCharacterRepository(CharacterRepository):
+    def __init__(self):
+        # dicts preservam a ordem de inserção
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._id_by_share_id: Dict[str, str] = {}
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        if doc["id"] in self._by_id or doc["share_id"] in self._id_by_share_id:
+            raise ValueError("Personagem duplicado")
+        self._by_id[doc["id"]] = copy.deepcopy(doc)
+        self._id_by_share_id[doc["share_id"]] = doc["id"]
+
+    async def get(self, character_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._by_id.get(character_id)
+        return copy.deepcopy(doc) if doc is not None else None
+
+    async def get_by_share_id(self, share_id: str) -> Optional[Dict[str, Any]]:
+        character_id = self._id_by_share_id.get(share_id)
+        return await self.get(character_id) if character_id else None
+
+    async def find(self, filters: Optional[CharacterFilter] = None, skip: int = 0, limit: int = 1000,
+                   fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        docs = self._by_id.values()
+        if filters is not None:
+            docs = [doc for doc in docs if matches(doc, filters)]
+        return [copy.deepcopy(project(doc, fields)) for doc in islice(docs, skip, skip + limit)]
+
+    async def find_changed(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        docs = sorted(self._by_id.values(), key=lambda doc: (doc.get("updated_at", ""), doc["id"]))
+        if after is not None:
+            docs = [doc for doc in docs if (doc.get("updated_at", ""), doc["id"]) > after]
+        return [copy.deepcopy(doc) for doc in docs[:limit]]
+
+    async def update(self, character_id: str, fields: Dict[str, Any]) -> Optional[UpdateResult]:
+        doc = self._by_id.get(character_id)
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        doc.update(copy.deepcopy(fields))
+        doc["version"] = doc.get("version", 0) + 1
+        return UpdateResult(before=before, after=copy.deepcopy(doc))
+
+    async def update_items(self, character_id: str, operations: Sequence[ItemOperation],
+                           updated_at: str) -> Optional[UpdateResult]:
+        doc = self._by_id.get(character_id)
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        apply_item_operations(doc, operations)
+        doc["updated_at"] = updated_at
+        doc["version"] = doc.get("version", 0) + 1
+        return UpdateResult(before=before, after=copy.deepcopy(doc))
+
+    async def delete(self, character_id: str) -> bool:
+        doc = self._by_id.pop(character_id, None)
+        if doc is None:
+            return False
+        self._id_by_share_id.pop(doc["share_id"], None)
+        return True
+
+    async def push_note(self, character_id: str, note: Dict[str, Any], preview_size: int, updated_at: str) -> bool:
+        doc = self._by_id.get(character_id)
+        if doc is None:
+            return False
+        notes = (doc.get("notes") or []) + [copy.deepcopy(note)]
+        doc["notes"] = notes[-preview_size:]
+        doc["notes_count"] = doc.get("notes_count", 0) + 1
+        doc["updated_at"] = updated_at
+        return True
+
+    async def refresh_notes(self, character_id: str, preview: List[Dict[str, Any]], count_delta: int,
+                            updated_at: Optional[str] = None) -> bool:
+        doc = self._by_id.get(character_id)
+        if doc is None:
+            return False
+        doc["notes"] = copy.deepcopy(preview)
+        doc["notes_count"] = doc.get("notes_count", 0) + count_delta
+        if updated_at is not None:
+            doc["updated_at"] = updated_at
+        return True
+
+    async def migrate_notes(self, character_id: str, preview: List[Dict[str, Any]], count: int) -> bool:
+        doc = self._by_id.get(character_id)
+        if doc is None or "notes_count" in doc:
+            return False
+        doc["notes"] = copy.deepcopy(preview)
+        doc["notes_count"] = count
+        return True
+
+    async def find_without_notes_count(self, limit: int = 100) -> List[Dict[str, Any]]:
+        legacy = (doc for doc in self._by_id.values() if "notes_count" not in doc)
+        return [copy.deepcopy(project(doc, ["id", "notes"])) for doc in islice(legacy, limit)]
+
+    async def roster_stats(self) -> Dict[str, Any]:
+        stats = empty_roster_stats()
+        if not self._by_id:
+            return stats
+        by_clan, by_class, by_level, by_condition = Counter(), Counter(), Counter(), Counter()
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for doc in self._by_id.values():
+            by_clan[doc.get("clan_id")] += 1
+            by_class[doc.get("class_id")] += 1
+            by_level[doc.get("level", 1)] += 1
+            by_condition[doc.get("condition", "Normal")] += 1
+            totals = sums[doc.get("class_id")]
+            totals["hp"] += doc.get("hp", 0)
+            totals["max_hp"] += doc.get("max_hp", doc.get("hp", 0))
+            totals["chakra"] += doc.get("chakra", 0)
+            totals["max_chakra"] += doc.get("max_chakra", doc.get("chakra", 0))
+        stats["total"] = len(self._by_id)
+        stats["by_clan"] = [{"clan_id": k, "count": v} for k, v in sorted(by_clan.items())]
+        stats["by_class"] = [{"class_id": k, "count": v} for k, v in sorted(by_class.items())]
+        stats["by_level"] = [{"level": k, "count": v} for k, v in sorted(by_level.items())]
+        stats["by_condition"] = [{"condition": k, "count": v} for k, v in sorted(by_condition.items())]
+        stats["class_averages"] = [
+            {
+                "class_id": class_id,
+                "count": by_class[class_id],
+                **{f"avg_{field}": total / by_class[class_id] for field, total in totals.items()},
+            }
+            for class_id, totals in sorted(sums.items())
+        ]
+        return stats
+
+
+class MemoryHistoryRepository(HistoryRepository):
+    def __init__(self):
+        # character_id -> entradas em ordem crescente de versão
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _within(entry: Dict[str, Any], version: Optional[int], until: Optional[str]) -> bool:
+        return ((version is None or entry["version"] <= version)
+                and (until is None or entry["timestamp"] <= until))
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        entries = self._entries.setdefault(entry["character_id"], [])
+        if entries and entries[-1]["version"] >= entry["version"]:
+            raise ValueError("Versão de histórico fora de ordem")
+        entries.append(copy.deepcopy(entry))
+
+    async def latest_checkpoint(self, character_id: str, version: Optional[int] = None,
+                                until: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        for entry in reversed(self._entries.get(character_id, [])):
+            if entry["is_checkpoint"] and self._within(entry, version, until):
+                return copy.deepcopy(entry)
+        return None
+
+    async def entries_after(self, character_id: str, after_version: int, version: Optional[int] = None,
+                            until: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            copy.deepcopy({k: v for k, v in entry.items() if k != "checkpoint"})
+            for entry in self._entries.get(character_id, [])
+            if entry["version"] > after_version and self._within(entry, version, until)
+        ]
+
+    async def list(self, character_id: str, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        entries = reversed(self._entries.get(character_id, []))
+        return [
+            copy.deepcopy({k: v for k, v in entry.items() if k != "checkpoint"})
+            for entry in islice(entries, skip, skip + limit)
+        ]
+
+
+class MemoryNoteRepository(NoteRepository):
+    def __init__(self):
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # character_id -> ids das notas
+        self._ids_by_character: Dict[str, List[str]] = {}
+
+    async def add(self, note: Dict[str, Any]) -> None:
+        if note["id"] in self._by_id:
+            raise ValueError("Nota duplicada")
+        self._by_id[note["id"]] = copy.deepcopy(note)
+        self._ids_by_character.setdefault(note["character_id"], []).append(note["id"])
+
+    async def add_many(self, notes: List[Dict[str, Any]]) -> None:
+        for note in notes:
+            if note["id"] not in self._by_id:
+                await self.add(note)
+
+    async def update(self, character_id: str, note_id: str, content: str, updated_at: str) -> Optional[Dict[str, Any]]:
+        note = self._by_id.get(note_id)
+        if note is None or note["character_id"] != character_id:
+            return None
+        note["content"] = content
+        note["updated_at"] = updated_at
+        return {k: v for k, v in copy.deepcopy(note).items() if k != "character_id"}
+
+    async def delete(self, character_id: str, note_id: str) -> bool:
+        note = self._by_id.get(note_id)
+        if note is None or note["character_id"] != character_id:
+            return False
+        del self._by_id[note_id]
+        self._ids_by_character[character_id].remove(note_id)
+        return True
+
+    async def delete_for_character(self, character_id: str) -> None:
+        for note_id in self._ids_by_character.pop(character_id, []):
+            self._by_id.pop(note_id, None)
+
+    async def list(self, character_id: str, limit: int = 20,
+                   before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        notes = sorted(
+            (self._by_id[note_id] for note_id in self._ids_by_character.get(character_id, [])),
+            key=lambda note: (note["created_at"], note["id"]),
+            reverse=True
+        )
+        if before is not None:
+            notes = [note for note in notes if (note["created_at"], note["id"]) < before]
+        return [
+            {k: v for k, v in copy.deepcopy(note).items() if k != "character_id"}
+            for note in notes[:limit]
+        ]
+
+
+class MemoryTombstoneRepository(TombstoneRepository):
+    def __init__(self):
+        # Uma remoção por id, como o upsert dos outros backends
+        self._tombstones: Dict[str, Dict[str, Any]] = {}
+
+    async def add(self, character_id: str, deleted_at: str) -> None:
+        self._tombstones[character_id] = {"id": character_id, "deleted_at": deleted_at}
+
+    async def list(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        tombstones = sorted(self._tombstones.values(), key=lambda t: (t["deleted_at"], t["id"]))
+        if after is not None:
+            tombstones = [t for t in tombstones if (t["deleted_at"], t["id"]) > after]
+        return [dict(t) for t in tombstones[:limit]]
+
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    # Acima deste tamanho as chaves vencidas são varridas a cada reserva
+    SWEEP_THRESHOLD = 10000
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+
+    async def reserve(self, key: str, fingerprint: str, owner: str, expires_at: datetime,
+                      locked_until: datetime) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        if len(self._records) >= self.SWEEP_THRESHOLD:
+            for expired in [k for k, r in self._records.items() if r["expires_at"] <= now]:
+                del self._records[expired]
+        record = self._records.get(key)
+        if record is not None and record["expires_at"] > now and (
+                record["status_code"] is not None or record["locked_until"] > now):
+            return dict(record)
+        self._records[key] = {
+            "key": key, "fingerprint": fingerprint, "owner": owner, "status_code": None,
+            "expires_at": expires_at, "locked_until": locked_until,
+        }
+        return None
+
+    async def complete(self, key: str, owner: str, status_code: int, content_type: str, body: bytes) -> None:
+        record = self._records.get(key)
+        if record is not None and record["owner"] == owner:
+            record.update(status_code=status_code, content_type=content_type, body=body)
+
+    async def release(self, key: str, owner: str) -> None:
+        record = self._records.get(key)
+        if record is not None and record["owner"] == owner and record["status_code"] is None:
+            del self._records[key]
+
+
+class MemoryShareSnapshotRepository(ShareSnapshotRepository):
+    def __init__(self):
+        self._by_share_id: Dict[str, Dict[str, Any]] = {}
+
+    async def put(self, share_id: str, character_id: str, version: int, content_etag: str,
+                  body: bytes, etag: str) -> None:
+        current = self._by_share_id.get(share_id)
+        if current is not None and (current["deleted"] or current["version"] > version):
+            return
+        self._by_share_id[share_id] = {
+            "version": version, "content_etag": content_etag, "body": body, "etag": etag, "deleted": False
+        }
+
+    async def get(self, share_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self._by_share_id.get(share_id)
+        if snapshot is None or snapshot["deleted"]:
+            return None
+        return {"body": snapshot["body"], "etag": snapshot["etag"], "content_etag": snapshot["content_etag"]}
+
+    async def delete(self, share_id: str, character_id: str) -> None:
+        self._by_share_id[share_id] = {"deleted": True}
+
+
+class MemorySettingRepository(SettingRepository):
+    def __init__(self):
+        self._values: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._values.get(name))
+
+    async def put(self, name: str, value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        previous = self._values.get(name)
+        self._values[name] = copy.deepcopy(value)
+        return previous
+
+
+class MemoryStorage(Storage):
+    name = "memory"
+
+    def __init__(self):
+        self.characters = MemoryCharacterRepository()
+        self.history = MemoryHistoryRepository()
+        self.notes = MemoryNoteRepository()
+        self.tombstones = MemoryTombstoneRepository()
+        self.idempotency = MemoryIdempotencyRepository()
+        self.share_snapshots = MemoryShareSnapshotRepository()
+        self.settings = MemorySettingRepository()
@@ -0,0 +1,558 @@
+# Backend MongoDB (Motor)
+import asyncio
+import copy
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from metrics import MongoCommandMetrics, MongoPoolMetrics
+from storage.base import (
+    QUANTITY_FIELDS, CharacterFilter, CharacterRepository, HistoryRepository, IdempotencyRepository, ItemNotFoundError,
+    ItemOperation, NoteRepository, SettingRepository, ShareSnapshotRepository, Storage, TombstoneRepository,
+    UpdateResult, apply_item_operations, empty_roster_stats, required_items
+)
+
+# Comparação sem diferenciar maiúsculas; o índice de nome usa a mesma collation
+NAME_COLLATION = {"locale": "pt", "strength": 2}
+
+
+def build_query(filters: Optional[CharacterFilter]) -> Dict[str, Any]:
+    """Traduz os filtros para uma consulta do MongoDB"""
+    query: Dict[str, Any] = {}
+    if filters is None:
+        return query
+    if filters.clan_id:
+        query["clan_id"] = filters.clan_id
+    if filters.class_id:
+        query["class_id"] = filters.class_id
+    if filters.min_level is not None or filters.max_level is not None:
+        level: Dict[str, int] = {}
+        if filters.min_level is not None:
+            level["$gte"] = filters.min_level
+        if filters.max_level is not None:
+            level["$lte"] = filters.max_level
+        query["level"] = level
+    if filters.condition:
+        query["condition"] = filters.condition
+    if filters.rank:
+        query["description.rank"] = filters.rank
+    if filters.text:
+        # Termos entre aspas: $text exige todos, como o FTS do SQLite e o backend em memória
+        query["$text"] = {"$search": " ".join('"' + term.replace('"', '') + '"' for term in filters.text.split())}
+    if filters.name_prefix:
+        if filters.text:
+            # $text não aceita collation; o prefixo vira um filtro residual
+            query["name"] = {"$regex": "^" + re.escape(filters.name_prefix), "$options": "i"}
+        else:
+            # Faixa sobre o índice com collation: prefixo sem diferenciar maiúsculas
+            query["name"] = {"$gte": filters.name_prefix, "$lt": filters.name_prefix + "\uffff"}
+    return query
+
+
+def _merge_duplicates(field: str, names: List[str]) -> Dict[str, Any]:
+    """Expressão que junta itens repetidos dos nomes dados no primeiro deles (como em apply_item_operations)"""
+    if field in QUANTITY_FIELDS:
+        merged: Any = {"$mergeObjects": ["$$kept", {"quantity": {"$add": [
+            {"$ifNull": ["$$kept.quantity", 1]}, {"$ifNull": ["$$this.quantity", 1]}
+        ]}}]}
+    else:
+        merged = "$$kept"
+    return {"$reduce": {
+        "input": {"$ifNull": [f"${field}", []]},
+        "initialValue": [],
+        "in": {"$cond": [
+            {"$and": [
+                {"$eq": [{"$type": "$$this"}, "object"]},
+                {"$in": ["$$this.name", {"$literal": names}]},
+                {"$in": ["$$this.name", "$$value.name"]},
+            ]},
+            {"$map": {"input": "$$value", "as": "kept", "in": {
+                "$cond": [{"$eq": ["$$kept.name", "$$this.name"]}, merged, "$$kept"]
+            }}},
+            {"$concatArrays": ["$$value", ["$$this"]]},
+        ]},
+    }}
+
+
+def _item_expression(operation: ItemOperation) -> Dict[str, Any]:
+    """Novo valor da lista após uma operação (a lista já existe: _merge_duplicates roda antes)"""
+    items = f"${operation.field}"
+    named = {"$eq": ["$$i.name", {"$literal": operation.name}]}
+    if operation.op == "add":
+        if operation.field in QUANTITY_FIELDS:
+            merged = {"$mergeObjects": ["$$i", {"quantity": {"$add": [
+                {"$ifNull": ["$$i.quantity", 1]}, operation.item.get("quantity", 1)
+            ]}}]}
+        else:
+            merged = {"$mergeObjects": ["$$i", {"$literal": operation.item}]}
+        return {"$cond": [
+            {"$in": [{"$literal": operation.name}, f"{items}.name"]},
+            {"$map": {"input": items, "as": "i", "in": {"$cond": [named, merged, "$$i"]}}},
+            {"$concatArrays": [items, [{"$literal": operation.item}]]},
+        ]}
+    if operation.op == "remove":
+        return {"$filter": {"input": items, "as": "i", "cond": {"$not": [named]}}}
+    # quantity: itens zerados são removidos
+    changed = {"$map": {"input": items, "as": "i", "in": {"$cond": [named, {"$mergeObjects": ["$$i", {"quantity": {
+        "$add": [{"$ifNull": ["$$i.quantity", 1]}, operation.delta]
+    }}]}, "$$i"]}}}
+    emptied = {"$and": [named, {"$lte": ["$$i.quantity", 0]}]}
+    return {"$filter": {"input": changed, "as": "i", "cond": {"$not": [emptied]}}}
+
+
+def item_pipeline(operations: Sequence[ItemOperation], updated_at: str) -> List[Dict[str, Any]]:
+    """Pipeline de atualização com as operações em ordem, um estágio $set por operação"""
+    touched: Dict[str, List[str]] = {}
+    for operation in operations:
+        touched.setdefault(operation.field, []).append(operation.name)
+    pipeline: List[Dict[str, Any]] = []
+    if touched:
+        pipeline.append({"$set": {field: _merge_duplicates(field, names) for field, names in touched.items()}})
+    pipeline.extend({"$set": {operation.field: _item_expression(operation)}} for operation in operations)
+    pipeline.append({"$set": {
+        "updated_at": {"$literal": updated_at}, "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+    }})
+    return pipeline
+
+
+class MongoCharacterRepository(CharacterRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        # insert_one adiciona _id ao dicionário; salva uma cópia rasa
+        await self.collection.insert_one(dict(doc))
+
+    async def get(self, character_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": character_id}, {"_id": 0})
+
+    async def get_by_share_id(self, share_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"share_id": share_id}, {"_id": 0})
+
+    async def find(self, filters: Optional[CharacterFilter] = None, skip: int = 0, limit: int = 1000,
+                   fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        projection: Dict[str, int] = {"_id": 0}
+        if fields is not None:
+            projection.update({field: 1 for field in fields})
+        cursor = self.collection.find(build_query(filters), projection)
+        if filters is not None and filters.name_prefix and not filters.text:
+            cursor = cursor.collation(NAME_COLLATION)
+        cursor = cursor.sort("_id", ASCENDING).skip(skip).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def find_changed(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {}
+        if after is not None:
+            query = {"$or": [
+                {"updated_at": {"$gt": after[0]}},
+                {"updated_at": after[0], "id": {"$gt": after[1]}},
+            ]}
+        cursor = self.collection.find(query, {"_id": 0}).sort([("updated_at", ASCENDING), ("id", ASCENDING)])
+        return await cursor.limit(limit).to_list(limit)
+
+    async def update(self, character_id: str, fields: Dict[str, Any]) -> Optional[UpdateResult]:
+        # Devolve o documento anterior (atômico) e deriva o novo aplicando o $set
+        before = await self.collection.find_one_and_update(
+            {"id": character_id},
+            {"$set": fields, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            return None
+        after = {**before, **fields, "version": before.get("version", 0) + 1}
+        return UpdateResult(before=before, after=after)
+
+    async def update_items(self, character_id: str, operations: Sequence[ItemOperation],
+                           updated_at: str) -> Optional[UpdateResult]:
+        # O lote inteiro é um pipeline numa só escrita atômica; o filtro exige os itens alterados ou removidos
+        query: Dict[str, Any] = {"id": character_id}
+        required = required_items(operations)
+        if required:
+            query["$and"] = [{f"{field}.name": name} for field, name in required]
+        before = await self.collection.find_one_and_update(
+            query,
+            item_pipeline(operations, updated_at),
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            if required and await self.collection.count_documents({"id": character_id}, limit=1):
+                raise ItemNotFoundError(", ".join(f"{field}: {name}" for field, name in required))
+            return None
+        # O pipeline e apply_item_operations têm a mesma semântica: o novo estado é derivado do anterior
+        after = copy.deepcopy(before)
+        apply_item_operations(after, operations)
+        after["updated_at"] = updated_at
+        after["version"] = before.get("version", 0) + 1
+        return UpdateResult(before=before, after=after)
+
+    async def delete(self, character_id: str) -> bool:
+        result = await self.collection.delete_one({"id": character_id})
+        return result.deleted_count > 0
+
+    async def push_note(self, character_id: str, note: Dict[str, Any], preview_size: int, updated_at: str) -> bool:
+        result = await self.collection.update_one(
+            {"id": character_id},
+            {
+                "$push": {"notes": {"$each": [note], "$slice": -preview_size}},
+                "$inc": {"notes_count": 1},
+                "$set": {"updated_at": updated_at},
+            }
+        )
+        return result.matched_count > 0
+
+    async def refresh_notes(self, character_id: str, preview: List[Dict[str, Any]], count_delta: int,
+                            updated_at: Optional[str] = None) -> bool:
+        fields: Dict[str, Any] = {"notes": preview}
+        if updated_at is not None:
+            fields["updated_at"] = updated_at
+        result = await self.collection.update_one(
+            {"id": character_id},
+            {"$set": fields, "$inc": {"notes_count": count_delta}}
+        )
+        return result.matched_count > 0
+
+    async def migrate_notes(self, character_id: str, preview: List[Dict[str, Any]], count: int) -> bool:
+        result = await self.collection.update_one(
+            {"id": character_id, "notes_count": {"$exists": False}},
+            {"$set": {"notes": preview, "notes_count": count}}
+        )
+        return result.modified_count > 0
+
+    async def find_without_notes_count(self, limit: int = 100) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"notes_count": {"$exists": False}}, {"_id": 0, "id": 1, "notes": 1})
+        return await cursor.limit(limit).to_list(limit)
+
+    async def roster_stats(self) -> Dict[str, Any]:
+        def count_by(field: str, default: Any, key: str) -> List[Dict[str, Any]]:
+            return [
+                {"$group": {"_id": {"$ifNull": [f"${field}", default]}, "count": {"$sum": 1}}},
+                {"$project": {"_id": 0, key: "$_id", "count": 1}},
+                {"$sort": {key: 1}},
+            ]
+
+        pipeline = [
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "by_clan": count_by("clan_id", None, "clan_id"),
+                "by_class": count_by("class_id", None, "class_id"),
+                "by_level": count_by("level", 1, "level"),
+                "by_condition": count_by("condition", "Normal", "condition"),
+                "class_averages": [
+                    {"$group": {
+                        "_id": "$class_id",
+                        "count": {"$sum": 1},
+                        "avg_hp": {"$avg": "$hp"},
+                        "avg_max_hp": {"$avg": {"$ifNull": ["$max_hp", "$hp"]}},
+                        "avg_chakra": {"$avg": "$chakra"},
+                        "avg_max_chakra": {"$avg": {"$ifNull": ["$max_chakra", "$chakra"]}},
+                    }},
+                    {"$project": {
+                        "_id": 0, "class_id": "$_id", "count": 1,
+                        "avg_hp": 1, "avg_max_hp": 1, "avg_chakra": 1, "avg_max_chakra": 1,
+                    }},
+                    {"$sort": {"class_id": 1}},
+                ],
+            }}
+        ]
+        results = await self.collection.aggregate(pipeline).to_list(1)
+        if not results:
+            return empty_roster_stats()
+        facets = results[0]
+        facets["total"] = facets["total"][0]["count"] if facets["total"] else 0
+        return facets
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index("share_id", unique=True)
+        # Índices da busca
+        await self.collection.create_index([("clan_id", ASCENDING), ("class_id", ASCENDING), ("level", ASCENDING)])
+        await self.collection.create_index([("class_id", ASCENDING), ("level", ASCENDING)])
+        await self.collection.create_index([("condition", ASCENDING), ("level", ASCENDING)])
+        await self.collection.create_index([("description.rank", ASCENDING), ("level", ASCENDING)])
+        await self.collection.create_index("name", collation=NAME_COLLATION)
+        await self.collection.create_index(
+            [("name", TEXT), ("description.title", TEXT)],
+            default_language="portuguese",
+            weights={"name": 10, "description.title": 2}
+        )
+        # Sincronização incremental por marca d'água
+        await self.collection.create_index([("updated_at", ASCENDING), ("id", ASCENDING)])
+
+
+class MongoHistoryRepository(HistoryRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    @staticmethod
+    def _bounds(character_id: str, version: Optional[int], until: Optional[str]) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"character_id": character_id}
+        if version is not None:
+            query["version"] = {"$lte": version}
+        if until is not None:
+            query["timestamp"] = {"$lte": until}
+        return query
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        await self.collection.insert_one(dict(entry))
+
+    async def latest_checkpoint(self, character_id: str, version: Optional[int] = None,
+                                until: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query = self._bounds(character_id, version, until)
+        query["is_checkpoint"] = True
+        return await self.collection.find_one(query, {"_id": 0}, sort=[("version", DESCENDING)])
+
+    async def entries_after(self, character_id: str, after_version: int, version: Optional[int] = None,
+                            until: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = self._bounds(character_id, version, until)
+        query.setdefault("version", {})["$gt"] = after_version
+        cursor = self.collection.find(query, {"_id": 0, "checkpoint": 0}).sort("version", ASCENDING)
+        return await cursor.to_list(None)
+
+    async def list(self, character_id: str, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"character_id": character_id}, {"_id": 0, "checkpoint": 0})
+        return await cursor.sort("version", DESCENDING).skip(skip).limit(limit).to_list(limit)
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("character_id", ASCENDING), ("version", ASCENDING)], unique=True)
+        await self.collection.create_index([("character_id", ASCENDING), ("timestamp", ASCENDING)])
+        await self.collection.create_index(
+            [("character_id", ASCENDING), ("version", DESCENDING)],
+            name="checkpoints",
+            partialFilterExpression={"is_checkpoint": True}
+        )
+
+
+class MongoNoteRepository(NoteRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def add(self, note: Dict[str, Any]) -> None:
+        await self.collection.insert_one(dict(note))
+
+    async def add_many(self, notes: List[Dict[str, Any]]) -> None:
+        if notes:
+            await self.collection.bulk_write(
+                [UpdateOne({"id": note["id"]}, {"$setOnInsert": note}, upsert=True) for note in notes],
+                ordered=False
+            )
+
+    async def update(self, character_id: str, note_id: str, content: str, updated_at: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"id": note_id, "character_id": character_id},
+            {"$set": {"content": content, "updated_at": updated_at}},
+            projection={"_id": 0, "character_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, character_id: str, note_id: str) -> bool:
+        result = await self.collection.delete_one({"id": note_id, "character_id": character_id})
+        return result.deleted_count > 0
+
+    async def delete_for_character(self, character_id: str) -> None:
+        await self.collection.delete_many({"character_id": character_id})
+
+    async def list(self, character_id: str, limit: int = 20,
+                   before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"character_id": character_id}
+        if before is not None:
+            created_at, note_id = before
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": note_id}},
+            ]
+        cursor = self.collection.find(query, {"_id": 0, "character_id": 0})
+        cursor = cursor.sort([("created_at", DESCENDING), ("id", DESCENDING)]).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index(
+            [("character_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]
+        )
+
+
+class MongoTombstoneRepository(TombstoneRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def add(self, character_id: str, deleted_at: str) -> None:
+        await self.collection.update_one(
+            {"id": character_id}, {"$set": {"deleted_at": deleted_at}}, upsert=True
+        )
+
+    async def list(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {}
+        if after is not None:
+            query = {"$or": [
+                {"deleted_at": {"$gt": after[0]}},
+                {"deleted_at": after[0], "id": {"$gt": after[1]}},
+            ]}
+        cursor = self.collection.find(query, {"_id": 0}).sort([("deleted_at", ASCENDING), ("id", ASCENDING)])
+        return await cursor.limit(limit).to_list(limit)
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("deleted_at", ASCENDING), ("id", ASCENDING)])
+
+
+class MongoIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def reserve(self, key: str, fingerprint: str, owner: str, expires_at: datetime,
+                      locked_until: datetime) -> Optional[Dict[str, Any]]:
+        # O índice TTL remove as chaves com atraso; registros vencidos e reservas abandonadas são sobrescritos
+        now = datetime.now(timezone.utc)
+        existing = await self.collection.find_one(
+            {"key": key, "expires_at": {"$gt": now},
+             "$or": [{"status_code": {"$ne": None}}, {"locked_until": {"$gt": now}}]},
+            {"_id": 0}
+        )
+        if existing is not None:
+            return existing
+        record = {
+            "key": key, "fingerprint": fingerprint, "owner": owner, "status_code": None,
+            "expires_at": expires_at, "locked_until": locked_until,
+        }
+        try:
+            await self.collection.update_one(
+                {"key": key, "$or": [
+                    {"expires_at": {"$lte": now}},
+                    {"status_code": None, "locked_until": {"$not": {"$gt": now}}},
+                ]},
+                {"$set": record, "$unset": {"content_type": "", "body": ""}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Outra requisição reservou a mesma chave entre a leitura e a escrita
+            return await self.collection.find_one({"key": key}, {"_id": 0})
+        return None
+
+    async def complete(self, key: str, owner: str, status_code: int, content_type: str, body: bytes) -> None:
+        await self.collection.update_one(
+            {"key": key, "owner": owner},
+            {"$set": {"status_code": status_code, "content_type": content_type, "body": body}}
+        )
+
+    async def release(self, key: str, owner: str) -> None:
+        await self.collection.delete_one({"key": key, "owner": owner, "status_code": None})
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("key", unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+class MongoShareSnapshotRepository(ShareSnapshotRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def put(self, share_id: str, character_id: str, version: int, content_etag: str,
+                  body: bytes, etag: str) -> None:
+        try:
+            await self.collection.update_one(
+                {"share_id": share_id, "version": {"$lte": version}, "deleted": {"$ne": True}},
+                {"$set": {
+                    "character_id": character_id, "version": version, "content_etag": content_etag,
+                    "body": body, "etag": etag,
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Já existe uma ficha publicada de uma versão mais nova (ou a marca de remoção)
+            pass
+
+    async def get(self, share_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one(
+            {"share_id": share_id, "deleted": {"$ne": True}}, {"_id": 0, "body": 1, "etag": 1, "content_etag": 1}
+        )
+
+    async def delete(self, share_id: str, character_id: str) -> None:
+        await self.collection.replace_one(
+            {"share_id": share_id}, {"share_id": share_id, "character_id": character_id, "deleted": True}, upsert=True
+        )
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("share_id", unique=True)
+        await self.collection.create_index("character_id")
+
+
+class MongoSettingRepository(SettingRepository):
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"name": name}, {"_id": 0, "value": 1})
+        return doc["value"] if doc else None
+
+    async def put(self, name: str, value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        previous = await self.collection.find_one_and_update(
+            {"name": name}, {"$set": {"value": value}}, projection={"_id": 0, "value": 1},
+            upsert=True, return_document=ReturnDocument.BEFORE
+        )
+        return previous["value"] if previous else None
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("name", unique=True)
+
+
+class MongoStorage(Storage):
+    """O cliente é criado no lifespan, dentro do event loop de cada worker"""
+
+    name = "mongo"
+
+    def __init__(self, mongo_url: str, db_name: str, warm_connections: int = 0, **client_options: Any):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.warm_connections = warm_connections
+        self.client_options = client_options
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db = None
+        self.characters = MongoCharacterRepository()
+        self.history = MongoHistoryRepository()
+        self.notes = MongoNoteRepository()
+        self.tombstones = MongoTombstoneRepository()
+        self.idempotency = MongoIdempotencyRepository()
+        self.share_snapshots = MongoShareSnapshotRepository()
+        self.settings = MongoSettingRepository()
+
+    async def init(self) -> None:
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                self.mongo_url,
+                event_listeners=[MongoCommandMetrics(), MongoPoolMetrics()],
+                **self.client_options
+            )
+            self.db = self.client[self.db_name]
+            self.characters.collection = self.db.characters
+            self.history.collection = self.db.character_history
+            self.notes.collection = self.db.character_notes
+            self.tombstones.collection = self.db.character_tombstones
+            self.idempotency.collection = self.db.idempotency_keys
+            self.share_snapshots.collection = self.db.share_snapshots
+            self.settings.collection = self.db.settings
+
+        # Pings concorrentes abrem as conexões antes do primeiro request
+        await asyncio.gather(*(self.ping() for _ in range(max(1, self.warm_connections))))
+        await self.characters.ensure_indexes()
+        await self.history.ensure_indexes()
+        await self.notes.ensure_indexes()
+        await self.tombstones.ensure_indexes()
+        await self.idempotency.ensure_indexes()
+        await self.share_snapshots.ensure_indexes()
+        await self.settings.ensure_indexes()
+
+    async def ping(self) -> None:
+        if self.client is None:
+            raise RuntimeError("Cliente MongoDB não inicializado")
+        await self.client.admin.command("ping")
+
+    async def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
@@ -0,0 +1,697 @@
+# Backend SQLite (implantações pequenas de um único nó e uso offline)
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from storage.base import (
+    CharacterFilter, CharacterRepository, HistoryRepository, IdempotencyRepository, ItemOperation, NoteRepository,
+    SettingRepository, ShareSnapshotRepository, Storage, TombstoneRepository, UpdateResult, apply_item_operations,
+    empty_roster_stats, project
+)
+
+T = TypeVar("T")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def dumps(doc: Dict[str, Any]) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False)
+
+
+class SqliteDatabase:
+    """Conexão única protegida por lock; as chamadas rodam fora do event loop"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        with self._lock:
+            if self.conn is not None:
+                return
+            self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _locked(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            return fn(self.conn)
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        return await asyncio.to_thread(self._locked, fn)
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        return await asyncio.to_thread(self._transaction, fn)
+
+    def close(self) -> None:
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class SqliteCharacterRepository(CharacterRepository):
+    # Colunas derivadas do documento, usadas pelos índices da busca
+    INDEXED_COLUMNS = ("name_key", "clan_id", "class_id", "level", "condition", "rank", "name", "title", "updated_at")
+
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    @staticmethod
+    def _columns(doc: Dict[str, Any]) -> Tuple[Any, ...]:
+        description = doc.get("description") or {}
+        name = doc.get("name", "")
+        updated_at = doc.get("updated_at")
+        if isinstance(updated_at, datetime):
+            updated_at = updated_at.isoformat()
+        return (
+            name.casefold(),
+            doc.get("clan_id"),
+            doc.get("class_id"),
+            doc.get("level", 1),
+            doc.get("condition", "Normal"),
+            description.get("rank", ""),
+            name,
+            description.get("title", ""),
+            updated_at,
+        )
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS characters (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL,
+                share_id TEXT NOT NULL,
+                data TEXT NOT NULL
+            )"""
+        )
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(characters)")}
+        missing = [column for column in self.INDEXED_COLUMNS if column not in existing]
+        for column in missing:
+            conn.execute(f"ALTER TABLE characters ADD COLUMN {column}")
+        if missing:
+            # Preenche as colunas novas a partir do JSON já salvo
+            for row in conn.execute("SELECT seq, data FROM characters").fetchall():
+                conn.execute(
+                    f"UPDATE characters SET {', '.join(f'{c} = ?' for c in self.INDEXED_COLUMNS)} WHERE seq = ?",
+                    (*self._columns(json.loads(row["data"])), row["seq"])
+                )
+
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_characters_id ON characters (id)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_characters_share_id ON characters (share_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_clan_class_level ON characters (clan_id, class_id, level)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_class_level ON characters (class_id, level)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_condition_level ON characters (condition, level)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_rank_level ON characters (rank, level)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_name_key ON characters (name_key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters_updated_at ON characters (updated_at, id)")
+
+        # Busca textual (FTS5) sincronizada por triggers
+        fts_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'characters_fts'"
+        ).fetchone()
+        conn.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS characters_fts
+               USING fts5(name, title, content='characters', content_rowid='seq', tokenize='unicode61 remove_diacritics 2')"""
+        )
+        conn.execute(
+            """CREATE TRIGGER IF NOT EXISTS characters_fts_insert AFTER INSERT ON characters BEGIN
+                INSERT INTO characters_fts (rowid, name, title) VALUES (new.seq, new.name, new.title);
+            END"""
+        )
+        conn.execute(
+            """CREATE TRIGGER IF NOT EXISTS characters_fts_delete AFTER DELETE ON characters BEGIN
+                INSERT INTO characters_fts (characters_fts, rowid, name, title) VALUES ('delete', old.seq, old.name, old.title);
+            END"""
+        )
+        conn.execute(
+            """CREATE TRIGGER IF NOT EXISTS characters_fts_update AFTER UPDATE ON characters BEGIN
+                INSERT INTO characters_fts (characters_fts, rowid, name, title) VALUES ('delete', old.seq, old.name, old.title);
+                INSERT INTO characters_fts (rowid, name, title) VALUES (new.seq, new.name, new.title);
+            END"""
+        )
+        if not fts_exists:
+            conn.execute("INSERT INTO characters_fts (characters_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _where(filters: Optional[CharacterFilter]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if filters is not None:
+            if filters.clan_id:
+                clauses.append("clan_id = ?")
+                params.append(filters.clan_id)
+            if filters.class_id:
+                clauses.append("class_id = ?")
+                params.append(filters.class_id)
+            if filters.min_level is not None:
+                clauses.append("level >= ?")
+                params.append(filters.min_level)
+            if filters.max_level is not None:
+                clauses.append("level <= ?")
+                params.append(filters.max_level)
+            if filters.condition:
+                clauses.append("condition = ?")
+                params.append(filters.condition)
+            if filters.rank:
+                clauses.append("rank = ?")
+                params.append(filters.rank)
+            if filters.name_prefix:
+                # Faixa sobre name_key (índice) em vez de LIKE
+                prefix = filters.name_prefix.casefold()
+                clauses.append("name_key >= ? AND name_key < ?")
+                params.extend([prefix, prefix + "\uffff"])
+            if filters.text:
+                terms = " ".join('"' + term.replace('"', '""') + '"' for term in filters.text.split())
+                clauses.append("seq IN (SELECT rowid FROM characters_fts WHERE characters_fts MATCH ?)")
+                params.append(terms)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        data = dumps(doc)
+        await self.database.run(lambda conn: conn.execute(
+            f"INSERT INTO characters (id, share_id, data, {', '.join(self.INDEXED_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in self.INDEXED_COLUMNS)})",
+            (doc["id"], doc["share_id"], data, *self._columns(doc))
+        ))
+
+    async def _fetch_one(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        row = await self.database.run(lambda conn: conn.execute(
+            f"SELECT data FROM characters WHERE {column} = ?", (value,)
+        ).fetchone())
+        return json.loads(row["data"]) if row else None
+
+    async def get(self, character_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one("id", character_id)
+
+    async def get_by_share_id(self, share_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one("share_id", share_id)
+
+    async def find(self, filters: Optional[CharacterFilter] = None, skip: int = 0, limit: int = 1000,
+                   fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        where, params = self._where(filters)
+        rows = await self.database.run(lambda conn: conn.execute(
+            f"SELECT data FROM characters {where} ORDER BY seq LIMIT ? OFFSET ?", (*params, limit, skip)
+        ).fetchall())
+        return [project(json.loads(row["data"]), fields) for row in rows]
+
+    async def find_changed(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        where, params = "", ()
+        if after is not None:
+            where, params = "WHERE (updated_at, id) > (?, ?)", after
+        rows = await self.database.run(lambda conn: conn.execute(
+            f"SELECT data FROM characters {where} ORDER BY updated_at, id LIMIT ?", (*params, limit)
+        ).fetchall())
+        return [json.loads(row["data"]) for row in rows]
+
+    async def update(self, character_id: str, fields: Dict[str, Any]) -> Optional[UpdateResult]:
+        def apply(conn: sqlite3.Connection) -> Optional[UpdateResult]:
+            row = conn.execute("SELECT data FROM characters WHERE id = ?", (character_id,)).fetchone()
+            if row is None:
+                return None
+            before = json.loads(row["data"])
+            doc = {**before, **json.loads(dumps(fields)), "version": before.get("version", 0) + 1}
+            conn.execute(
+                f"UPDATE characters SET data = ?, {', '.join(f'{c} = ?' for c in self.INDEXED_COLUMNS)} WHERE id = ?",
+                (dumps(doc), *self._columns(doc), character_id)
+            )
+            return UpdateResult(before=before, after=doc)
+
+        return await self.database.transaction(apply)
+
+    async def delete(self, character_id: str) -> bool:
+        cursor = await self.database.run(lambda conn: conn.execute(
+            "DELETE FROM characters WHERE id = ?", (character_id,)
+        ))
+        return cursor.rowcount > 0
+
+    async def update_items(self, character_id: str, operations: Sequence[ItemOperation],
+                           updated_at: str) -> Optional[UpdateResult]:
+        def apply(conn: sqlite3.Connection) -> Optional[UpdateResult]:
+            row = conn.execute("SELECT data FROM characters WHERE id = ?", (character_id,)).fetchone()
+            if row is None:
+                return None
+            before = json.loads(row["data"])
+            doc = json.loads(row["data"])
+            apply_item_operations(doc, operations)
+            doc["updated_at"] = updated_at
+            doc["version"] = before.get("version", 0) + 1
+            conn.execute(
+                f"UPDATE characters SET data = ?, {', '.join(f'{c} = ?' for c in self.INDEXED_COLUMNS)} WHERE id = ?",
+                (dumps(doc), *self._columns(doc), character_id)
+            )
+            return UpdateResult(before=before, after=doc)
+
+        return await self.database.transaction(apply)
+
+    def _modify(self, conn: sqlite3.Connection, character_id: str, change: Callable[[Dict[str, Any]], None]) -> bool:
+        """Lê, altera e regrava o documento (dentro de uma transação)"""
+        row = conn.execute("SELECT data FROM characters WHERE id = ?", (character_id,)).fetchone()
+        if row is None:
+            return False
+        doc = json.loads(row["data"])
+        change(doc)
+        conn.execute(
+            f"UPDATE characters SET data = ?, {', '.join(f'{c} = ?' for c in self.INDEXED_COLUMNS)} WHERE id = ?",
+            (dumps(doc), *self._columns(doc), character_id)
+        )
+        return True
+
+    async def push_note(self, character_id: str, note: Dict[str, Any], preview_size: int, updated_at: str) -> bool:
+        def change(doc: Dict[str, Any]) -> None:
+            doc["notes"] = ((doc.get("notes") or []) + [json.loads(dumps(note))])[-preview_size:]
+            doc["notes_count"] = doc.get("notes_count", 0) + 1
+            doc["updated_at"] = updated_at
+
+        return await self.database.transaction(lambda conn: self._modify(conn, character_id, change))
+
+    async def refresh_notes(self, character_id: str, preview: List[Dict[str, Any]], count_delta: int,
+                            updated_at: Optional[str] = None) -> bool:
+        def change(doc: Dict[str, Any]) -> None:
+            doc["notes"] = json.loads(dumps(preview))
+            doc["notes_count"] = doc.get("notes_count", 0) + count_delta
+            if updated_at is not None:
+                doc["updated_at"] = updated_at
+
+        return await self.database.transaction(lambda conn: self._modify(conn, character_id, change))
+
+    async def migrate_notes(self, character_id: str, preview: List[Dict[str, Any]], count: int) -> bool:
+        migrated = False
+
+        def change(doc: Dict[str, Any]) -> None:
+            nonlocal migrated
+            # Outro worker pode ter migrado entre a leitura e esta transação
+            if "notes_count" not in doc:
+                doc["notes"] = json.loads(dumps(preview))
+                doc["notes_count"] = count
+                migrated = True
+
+        await self.database.transaction(lambda conn: self._modify(conn, character_id, change))
+        return migrated
+
+    async def find_without_notes_count(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = await self.database.run(lambda conn: conn.execute(
+            "SELECT data FROM characters WHERE json_type(data, '$.notes_count') IS NULL LIMIT ?", (limit,)
+        ).fetchall())
+        return [project(json.loads(row["data"]), ["id", "notes"]) for row in rows]
+
+    async def roster_stats(self) -> Dict[str, Any]:
+        def aggregate(conn: sqlite3.Connection) -> Dict[str, Any]:
+            stats = empty_roster_stats()
+            stats["total"] = conn.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
+            for key, column in (("by_clan", "clan_id"), ("by_class", "class_id"),
+                                ("by_level", "level"), ("by_condition", "condition")):
+                rows = conn.execute(
+                    f"SELECT {column} AS value, COUNT(*) AS count FROM characters GROUP BY {column} ORDER BY {column}"
+                ).fetchall()
+                stats[key] = [{column: row["value"], "count": row["count"]} for row in rows]
+            rows = conn.execute(
+                """SELECT class_id, COUNT(*) AS count,
+                          AVG(json_extract(data, '$.hp')) AS avg_hp,
+                          AVG(COALESCE(json_extract(data, '$.max_hp'), json_extract(data, '$.hp'))) AS avg_max_hp,
+                          AVG(json_extract(data, '$.chakra')) AS avg_chakra,
+                          AVG(COALESCE(json_extract(data, '$.max_chakra'), json_extract(data, '$.chakra'))) AS avg_max_chakra
+                   FROM characters GROUP BY class_id ORDER BY class_id"""
+            ).fetchall()
+            stats["class_averages"] = [dict(row) for row in rows]
+            return stats
+
+        return await self.database.run(aggregate)
+
+
+class SqliteHistoryRepository(HistoryRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS character_history (
+                character_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                timestamp TEXT NOT NULL,
+                is_checkpoint INTEGER NOT NULL,
+                changes TEXT NOT NULL,
+                checkpoint TEXT,
+                PRIMARY KEY (character_id, version)
+            ) WITHOUT ROWID"""
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_timestamp ON character_history (character_id, timestamp)"
+        )
+        conn.execute(
+            """CREATE INDEX IF NOT EXISTS idx_history_checkpoints
+               ON character_history (character_id, version) WHERE is_checkpoint = 1"""
+        )
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row, with_checkpoint: bool = False) -> Dict[str, Any]:
+        entry = {
+            "character_id": row["character_id"],
+            "version": row["version"],
+            "timestamp": row["timestamp"],
+            "is_checkpoint": bool(row["is_checkpoint"]),
+            "changes": json.loads(row["changes"]),
+        }
+        if with_checkpoint:
+            entry["checkpoint"] = json.loads(row["checkpoint"]) if row["checkpoint"] else None
+        return entry
+
+    @staticmethod
+    def _bounds(character_id: str, version: Optional[int], until: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = ["character_id = ?"], [character_id]
+        if version is not None:
+            clauses.append("version <= ?")
+            params.append(version)
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        return " AND ".join(clauses), params
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        checkpoint = entry.get("checkpoint")
+        await self.database.run(lambda conn: conn.execute(
+            """INSERT INTO character_history (character_id, version, timestamp, is_checkpoint, changes, checkpoint)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (entry["character_id"], entry["version"], entry["timestamp"], int(entry["is_checkpoint"]),
+             dumps(entry["changes"]), dumps(checkpoint) if checkpoint is not None else None)
+        ))
+
+    async def latest_checkpoint(self, character_id: str, version: Optional[int] = None,
+                                until: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        where, params = self._bounds(character_id, version, until)
+        row = await self.database.run(lambda conn: conn.execute(
+            f"SELECT * FROM character_history WHERE {where} AND is_checkpoint = 1 ORDER BY version DESC LIMIT 1",
+            params
+        ).fetchone())
+        return self._row_to_entry(row, with_checkpoint=True) if row else None
+
+    async def entries_after(self, character_id: str, after_version: int, version: Optional[int] = None,
+                            until: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = self._bounds(character_id, version, until)
+        rows = await self.database.run(lambda conn: conn.execute(
+            f"""SELECT character_id, version, timestamp, is_checkpoint, changes FROM character_history
+                WHERE {where} AND version > ? ORDER BY version""",
+            (*params, after_version)
+        ).fetchall())
+        return [self._row_to_entry(row) for row in rows]
+
+    async def list(self, character_id: str, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = await self.database.run(lambda conn: conn.execute(
+            """SELECT character_id, version, timestamp, is_checkpoint, changes FROM character_history
+               WHERE character_id = ? ORDER BY version DESC LIMIT ? OFFSET ?""",
+            (character_id, limit, skip)
+        ).fetchall())
+        return [self._row_to_entry(row) for row in rows]
+
+
+class SqliteNoteRepository(NoteRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS character_notes (
+                id TEXT PRIMARY KEY,
+                character_id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT
+            )"""
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notes_character ON character_notes (character_id, created_at, id)"
+        )
+
+    @staticmethod
+    def _row_to_note(row: sqlite3.Row) -> Dict[str, Any]:
+        note = {"id": row["id"], "content": row["content"], "created_at": row["created_at"]}
+        if row["updated_at"] is not None:
+            note["updated_at"] = row["updated_at"]
+        return note
+
+    @staticmethod
+    def _params(note: Dict[str, Any]) -> Tuple[Any, ...]:
+        created_at = note["created_at"]
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        return note["id"], note["character_id"], note["content"], created_at, note.get("updated_at")
+
+    async def add(self, note: Dict[str, Any]) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            "INSERT INTO character_notes (id, character_id, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            self._params(note)
+        ))
+
+    async def add_many(self, notes: List[Dict[str, Any]]) -> None:
+        await self.database.transaction(lambda conn: conn.executemany(
+            """INSERT OR IGNORE INTO character_notes (id, character_id, content, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            [self._params(note) for note in notes]
+        ))
+
+    async def update(self, character_id: str, note_id: str, content: str, updated_at: str) -> Optional[Dict[str, Any]]:
+        def apply(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            conn.execute(
+                "UPDATE character_notes SET content = ?, updated_at = ? WHERE id = ? AND character_id = ?",
+                (content, updated_at, note_id, character_id)
+            )
+            row = conn.execute(
+                "SELECT * FROM character_notes WHERE id = ? AND character_id = ?", (note_id, character_id)
+            ).fetchone()
+            return self._row_to_note(row) if row else None
+
+        return await self.database.transaction(apply)
+
+    async def delete(self, character_id: str, note_id: str) -> bool:
+        cursor = await self.database.run(lambda conn: conn.execute(
+            "DELETE FROM character_notes WHERE id = ? AND character_id = ?", (note_id, character_id)
+        ))
+        return cursor.rowcount > 0
+
+    async def delete_for_character(self, character_id: str) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            "DELETE FROM character_notes WHERE character_id = ?", (character_id,)
+        ))
+
+    async def list(self, character_id: str, limit: int = 20,
+                   before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        if before is None:
+            sql = "SELECT * FROM character_notes WHERE character_id = ? ORDER BY created_at DESC, id DESC LIMIT ?"
+            params: Tuple[Any, ...] = (character_id, limit)
+        else:
+            sql = """SELECT * FROM character_notes WHERE character_id = ? AND (created_at, id) < (?, ?)
+                     ORDER BY created_at DESC, id DESC LIMIT ?"""
+            params = (character_id, before[0], before[1], limit)
+        rows = await self.database.run(lambda conn: conn.execute(sql, params).fetchall())
+        return [self._row_to_note(row) for row in rows]
+
+
+class SqliteTombstoneRepository(TombstoneRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS character_tombstones (
+                id TEXT PRIMARY KEY,
+                deleted_at TEXT NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tombstones_deleted_at ON character_tombstones (deleted_at, id)")
+
+    async def add(self, character_id: str, deleted_at: str) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO character_tombstones (id, deleted_at) VALUES (?, ?)", (character_id, deleted_at)
+        ))
+
+    async def list(self, after: Optional[Tuple[str, str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        where, params = "", ()
+        if after is not None:
+            where, params = "WHERE (deleted_at, id) > (?, ?)", after
+        rows = await self.database.run(lambda conn: conn.execute(
+            f"SELECT id, deleted_at FROM character_tombstones {where} ORDER BY deleted_at, id LIMIT ?",
+            (*params, limit)
+        ).fetchall())
+        return [dict(row) for row in rows]
+
+
+class SqliteIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status_code INTEGER,
+                content_type TEXT,
+                body BLOB,
+                expires_at TEXT NOT NULL,
+                owner TEXT,
+                locked_until TEXT
+            )"""
+        )
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(idempotency_keys)")}
+        for column in ("owner", "locked_until"):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE idempotency_keys ADD COLUMN {column} TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_expires_at ON idempotency_keys (expires_at)")
+
+    async def reserve(self, key: str, fingerprint: str, owner: str, expires_at: datetime,
+                      locked_until: datetime) -> Optional[Dict[str, Any]]:
+        def apply(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            now = datetime.now(timezone.utc).isoformat()
+            # Sem TTL nativo: as chaves vencidas são apagadas a cada reserva (pelo índice de expires_at)
+            conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            row = conn.execute("SELECT * FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+            # Uma reserva sem resposta e com o prazo vencido foi abandonada e pode ser assumida
+            if row is not None and (row["status_code"] is not None or (row["locked_until"] or "") > now):
+                return dict(row)
+            conn.execute(
+                """INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, owner, expires_at, locked_until)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (key, fingerprint, owner, expires_at.astimezone(timezone.utc).isoformat(),
+                 locked_until.astimezone(timezone.utc).isoformat())
+            )
+            return None
+
+        return await self.database.transaction(apply)
+
+    async def complete(self, key: str, owner: str, status_code: int, content_type: str, body: bytes) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            "UPDATE idempotency_keys SET status_code = ?, content_type = ?, body = ? WHERE key = ? AND owner = ?",
+            (status_code, content_type, body, key, owner)
+        ))
+
+    async def release(self, key: str, owner: str) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            "DELETE FROM idempotency_keys WHERE key = ? AND owner = ? AND status_code IS NULL", (key, owner)
+        ))
+
+
+class SqliteShareSnapshotRepository(ShareSnapshotRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS share_snapshots (
+                share_id TEXT PRIMARY KEY,
+                character_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                etag TEXT NOT NULL,
+                body BLOB NOT NULL,
+                content_etag TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(share_snapshots)")}
+        if "content_etag" not in existing:
+            conn.execute("ALTER TABLE share_snapshots ADD COLUMN content_etag TEXT")
+        if "deleted" not in existing:
+            conn.execute("ALTER TABLE share_snapshots ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_share_snapshots_character ON share_snapshots (character_id)")
+
+    async def put(self, share_id: str, character_id: str, version: int, content_etag: str,
+                  body: bytes, etag: str) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            """INSERT INTO share_snapshots (share_id, character_id, version, content_etag, etag, body)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (share_id) DO UPDATE SET
+                   character_id = excluded.character_id, version = excluded.version,
+                   content_etag = excluded.content_etag, etag = excluded.etag, body = excluded.body
+               WHERE excluded.version >= share_snapshots.version AND NOT share_snapshots.deleted""",
+            (share_id, character_id, version, content_etag, etag, body)
+        ))
+
+    async def get(self, share_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.database.run(lambda conn: conn.execute(
+            "SELECT body, etag, content_etag FROM share_snapshots WHERE share_id = ? AND NOT deleted", (share_id,)
+        ).fetchone())
+        return dict(row) if row else None
+
+    async def delete(self, share_id: str, character_id: str) -> None:
+        await self.database.run(lambda conn: conn.execute(
+            """INSERT OR REPLACE INTO share_snapshots (share_id, character_id, version, etag, body, deleted)
+               VALUES (?, ?, 0, '', x'', 1)""",
+            (share_id, character_id)
+        ))
+
+
+class SqliteSettingRepository(SettingRepository):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        row = await self.database.run(lambda conn: conn.execute(
+            "SELECT value FROM settings WHERE name = ?", (name,)
+        ).fetchone())
+        return json.loads(row["value"]) if row else None
+
+    async def put(self, name: str, value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        def swap(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = conn.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)", (name, dumps(value)))
+            return json.loads(row["value"]) if row else None
+
+        return await self.database.transaction(swap)
+
+
+class SqliteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.database = SqliteDatabase(path)
+        self.characters = SqliteCharacterRepository(self.database)
+        self.history = SqliteHistoryRepository(self.database)
+        self.notes = SqliteNoteRepository(self.database)
+        self.tombstones = SqliteTombstoneRepository(self.database)
+        self.idempotency = SqliteIdempotencyRepository(self.database)
+        self.share_snapshots = SqliteShareSnapshotRepository(self.database)
+        self.settings = SqliteSettingRepository(self.database)
+
+    async def init(self) -> None:
+        await asyncio.to_thread(self.database.open)
+        await self.database.transaction(self.characters.create_schema)
+        await self.database.transaction(self.history.create_schema)
+        await self.database.transaction(self.notes.create_schema)
+        await self.database.transaction(self.tombstones.create_schema)
+        await self.database.transaction(self.idempotency.create_schema)
+        await self.database.transaction(self.share_snapshots.create_schema)
+        await self.database.transaction(self.settings.create_schema)
+
+    async def ping(self) -> None:
+        def check(conn: Optional[sqlite3.Connection]) -> None:
+            if conn is None:
+                raise RuntimeError("Banco SQLite não aberto")
+            conn.execute("SELECT 1").fetchone()
+
+        await self.database.run(check)
+
+    async def close(self) -> None:
+        self.database.close()
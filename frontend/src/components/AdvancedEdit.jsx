@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import axios from 'axios';
@@ -10,6 +10,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { ArrowLeft, Save, Plus, Minus, X, Loader, FileText } from 'lucide-react';
 import { toast } from 'sonner';
 import jsPDF from 'jspdf';
+import { newIdempotencyKey } from '@/lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -22,6 +23,8 @@ const AdvancedEdit = () => {
   const [charClass, setCharClass] = useState(null);
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
+  // Chave da alteração de XP pendente: tentar de novo o mesmo valor reutiliza a chave
+  const pendingXP = useRef(null);
   const [xpTable, setXpTable] = useState({});
   const [conditions, setConditions] = useState([]);
   
@@ -31,10 +34,13 @@ const AdvancedEdit = () => {
   const [newJutsuName, setNewJutsuName] = useState('');
   const [newJutsuDetails, setNewJutsuDetails] = useState('');
   const [newNote, setNewNote] = useState('');
+  const [notes, setNotes] = useState([]);
+  const [notesCursor, setNotesCursor] = useState(null);
   const [newProficiency, setNewProficiency] = useState('');
 
   useEffect(() => {
     fetchCharacter();
+    fetchNotes();
     fetchXPTable();
     fetchConditions();
   }, [id]);
@@ -48,6 +54,18 @@ const AdvancedEdit = () => {
     }
   };
 
+  const fetchNotes = async (cursor = null) => {
+    try {
+      const response = await axios.get(`${API}/characters/${id}/notes`, {
+        params: cursor ? { cursor } : {}
+      });
+      setNotes(prev => cursor ? [...prev, ...response.data.notes] : response.data.notes);
+      setNotesCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Erro ao buscar notas:', error);
+    }
+  };
+
   const fetchXPTable = async () => {
     try {
       const response = await axios.get(`${API}/xp-table`);
@@ -79,7 +97,11 @@ const AdvancedEdit = () => {
   const handleSave = async () => {
     setSaving(true);
     try {
-      await axios.put(`${API}/characters/${id}`, character);
+      // Listas de itens e notas já foram gravadas pelas próprias rotas
+      const fields = Object.fromEntries(
+        Object.entries(character).filter(([key]) => !['equipment', 'weapons', 'jutsus', 'notes'].includes(key))
+      );
+      await axios.put(`${API}/characters/${id}`, fields);
       toast.success('Personagem atualizado com sucesso!');
       navigate(`/character/${id}`);
     } catch (error) {
@@ -91,8 +113,14 @@ const AdvancedEdit = () => {
   };
 
   const handleXPChange = async (newXP) => {
+    if (pendingXP.current?.xp !== newXP) {
+      pendingXP.current = { xp: newXP, key: newIdempotencyKey() };
+    }
     try {
-      const response = await axios.put(`${API}/characters/${id}/xp`, { xp: newXP });
+      const response = await axios.put(`${API}/characters/${id}/xp`, { xp: newXP }, {
+        headers: { 'Idempotency-Key': pendingXP.current.key }
+      });
+      pendingXP.current = null;
       setCharacter(response.data);
       
       if (response.data.level !== character.level) {
@@ -104,59 +132,90 @@ const AdvancedEdit = () => {
     }
   };
 
+  // Itens são gravados na hora, uma operação atômica por alteração
+  const applyItemOperations = async (operations) => {
+    try {
+      const response = await axios.patch(`${API}/characters/${id}/items`, { operations });
+      const { version, updated_at, ...lists } = response.data;
+      setCharacter(prev => ({ ...prev, ...lists, version, updated_at }));
+      return true;
+    } catch (error) {
+      console.error('Erro ao atualizar itens:', error);
+      if (error.response?.status === 404) {
+        // O item já não existe (outra aba o removeu): recarrega só as listas, sem perder edições não salvas
+        toast.error('Item não encontrado');
+        axios.get(`${API}/characters/${id}`).then(({ data }) => {
+          const { equipment, weapons, jutsus } = data;
+          setCharacter(prev => ({ ...prev, equipment, weapons, jutsus }));
+        }).catch(() => {});
+      } else {
+        toast.error('Erro ao atualizar itens');
+      }
+      return false;
+    }
+  };
+
+  const updateItemQuantity = (target, item, delta) => {
+    if (item.quantity + delta < 1) return;
+    applyItemOperations([{ op: 'quantity', target, name: item.name, quantity: delta }]);
+  };
+
   const updateEquipmentQuantity = (index, delta) => {
-    const newEquipment = [...character.equipment];
-    newEquipment[index].quantity = Math.max(1, newEquipment[index].quantity + delta);
-    setCharacter({ ...character, equipment: newEquipment });
+    updateItemQuantity('equipment', character.equipment[index], delta);
   };
 
   const updateWeaponQuantity = (index, delta) => {
-    const newWeapons = [...character.weapons];
-    newWeapons[index].quantity = Math.max(1, newWeapons[index].quantity + delta);
-    setCharacter({ ...character, weapons: newWeapons });
+    updateItemQuantity('weapons', character.weapons[index], delta);
   };
 
   const removeEquipment = (index) => {
-    const newEquipment = character.equipment.filter((_, i) => i !== index);
-    setCharacter({ ...character, equipment: newEquipment });
+    applyItemOperations([{ op: 'remove', target: 'equipment', name: character.equipment[index].name }]);
   };
 
   const removeWeapon = (index) => {
-    const newWeapons = character.weapons.filter((_, i) => i !== index);
-    setCharacter({ ...character, weapons: newWeapons });
+    applyItemOperations([{ op: 'remove', target: 'weapons', name: character.weapons[index].name }]);
   };
 
-  const addEquipment = () => {
-    if (newEquipment.trim()) {
-      const equipment = [...(character.equipment || []), { name: newEquipment.trim(), quantity: 1 }];
-      setCharacter({ ...character, equipment });
-      setNewEquipment('');
-      toast.success('Equipamento adicionado');
+  // Itens são identificados pelo nome: adicionar um nome existente soma a quantidade (ou atualiza o jutsu)
+  const hasItem = (target, name) => (character[target] || []).some(item => item.name === name);
+
+  const addEquipment = async () => {
+    const name = newEquipment.trim();
+    if (name) {
+      const existing = hasItem('equipment', name);
+      if (await applyItemOperations([{ op: 'add', target: 'equipment', name, quantity: 1 }])) {
+        setNewEquipment('');
+        toast.success(existing ? 'Quantidade atualizada' : 'Equipamento adicionado');
+      }
     }
   };
 
-  const addWeapon = () => {
-    if (newWeapon.trim()) {
-      const weapons = [...(character.weapons || []), { name: newWeapon.trim(), quantity: 1 }];
-      setCharacter({ ...character, weapons });
-      setNewWeapon('');
-      toast.success('Arma adicionada');
+  const addWeapon = async () => {
+    const name = newWeapon.trim();
+    if (name) {
+      const existing = hasItem('weapons', name);
+      if (await applyItemOperations([{ op: 'add', target: 'weapons', name, quantity: 1 }])) {
+        setNewWeapon('');
+        toast.success(existing ? 'Quantidade atualizada' : 'Arma adicionada');
+      }
     }
   };
 
-  const addJutsu = () => {
-    if (newJutsuName.trim()) {
-      const jutsus = [...(character.jutsus || []), { name: newJutsuName.trim(), details: newJutsuDetails.trim() }];
-      setCharacter({ ...character, jutsus });
-      setNewJutsuName('');
-      setNewJutsuDetails('');
-      toast.success('Jutsu adicionado');
+  const addJutsu = async () => {
+    const name = newJutsuName.trim();
+    if (name) {
+      const existing = hasItem('jutsus', name);
+      const operation = { op: 'add', target: 'jutsus', name, details: newJutsuDetails.trim() };
+      if (await applyItemOperations([operation])) {
+        setNewJutsuName('');
+        setNewJutsuDetails('');
+        toast.success(existing ? 'Jutsu atualizado' : 'Jutsu adicionado');
+      }
     }
   };
 
   const removeJutsu = (index) => {
-    const newJutsus = character.jutsus.filter((_, i) => i !== index);
-    setCharacter({ ...character, jutsus: newJutsus });
+    applyItemOperations([{ op: 'remove', target: 'jutsus', name: character.jutsus[index].name }]);
   };
 
   const addProficiency = () => {
@@ -173,22 +232,28 @@ const AdvancedEdit = () => {
     setCharacter({ ...character, proficiencies: newProfs });
   };
 
-  const addNote = () => {
+  const addNote = async () => {
     if (newNote.trim()) {
-      const notes = [...(character.notes || []), {
-        id: Date.now().toString(),
-        content: newNote.trim(),
-        created_at: new Date().toISOString()
-      }];
-      setCharacter({ ...character, notes });
-      setNewNote('');
-      toast.success('Nota adicionada');
+      try {
+        const response = await axios.post(`${API}/characters/${id}/notes`, { content: newNote.trim() });
+        setNotes([response.data, ...notes]);
+        setNewNote('');
+        toast.success('Nota adicionada');
+      } catch (error) {
+        console.error('Erro ao adicionar nota:', error);
+        toast.error('Erro ao adicionar nota');
+      }
     }
   };
 
-  const removeNote = (noteId) => {
-    const notes = character.notes.filter(n => n.id !== noteId);
-    setCharacter({ ...character, notes });
+  const removeNote = async (noteId) => {
+    try {
+      await axios.delete(`${API}/characters/${id}/notes/${noteId}`);
+      setNotes(notes.filter(n => n.id !== noteId));
+    } catch (error) {
+      console.error('Erro ao remover nota:', error);
+      toast.error('Erro ao remover nota');
+    }
   };
 
   const getXPForNextLevel = () => {
@@ -292,7 +357,7 @@ const AdvancedEdit = () => {
     }
     
     // Notes
-    if (character.notes && character.notes.length > 0) {
+    if (notes.length > 0) {
       if (yPos > 230) {
         pdf.addPage();
         yPos = 20;
@@ -306,7 +371,7 @@ const AdvancedEdit = () => {
       pdf.setFont(undefined, 'normal');
       pdf.setFontSize(10);
       
-      character.notes.forEach((note) => {
+      notes.forEach((note) => {
         const lines = pdf.splitTextToSize(note.content, 170);
         lines.forEach(line => {
           if (yPos > 280) {
@@ -798,7 +863,7 @@ const AdvancedEdit = () => {
           </div>
           
           <div className="space-y-3">
-            {character.notes && character.notes.map((note) => (
+            {notes.map((note) => (
               <div key={note.id} className="bg-slate-900/50 border border-slate-800 p-4">
                 <div className="flex justify-between items-start mb-2">
                   <span className="text-xs text-slate-500">
@@ -816,6 +881,11 @@ const AdvancedEdit = () => {
                 <p className="text-slate-300 whitespace-pre-wrap">{note.content}</p>
               </div>
             ))}
+            {notesCursor && (
+              <Button onClick={() => fetchNotes(notesCursor)} variant="ghost" size="sm" className="w-full text-slate-400">
+                Carregar mais notas
+              </Button>
+            )}
           </div>
         </div>
       </div>
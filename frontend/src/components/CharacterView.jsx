@@ -23,6 +23,9 @@ const CharacterView = () => {
   const [clan, setClan] = useState(null);
   const [charClass, setCharClass] = useState(null);
   const [loading, setLoading] = useState(true);
+  // Lista paginada de notas (null = só a prévia embutida no personagem)
+  const [notes, setNotes] = useState(null);
+  const [notesCursor, setNotesCursor] = useState(null);
 
   useEffect(() => {
     fetchCharacter();
@@ -47,6 +50,19 @@ const CharacterView = () => {
     }
   };
 
+  const fetchNotes = async (cursor = null) => {
+    try {
+      const response = await axios.get(`${API}/characters/${id}/notes`, {
+        params: cursor ? { cursor } : {}
+      });
+      setNotes(prev => cursor ? [...prev, ...response.data.notes] : response.data.notes);
+      setNotesCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Erro ao buscar notas:', error);
+      toast.error('Erro ao carregar notas');
+    }
+  };
+
   const handleShare = () => {
     const shareUrl = `${window.location.origin}/share/${character.share_id}`;
     navigator.clipboard.writeText(shareUrl);
@@ -515,9 +531,11 @@ const CharacterView = () => {
             transition={{ delay: 1.0 }}
             className="bg-card/40 border border-white/5 p-6 mb-8"
           >
-            <h3 className="text-xl font-heading font-bold text-white mb-4">Notas e Anotações</h3>
+            <h3 className="text-xl font-heading font-bold text-white mb-4">
+              Notas e Anotações ({character.notes_count || character.notes.length})
+            </h3>
             <div className="space-y-3">
-              {character.notes.map((note) => (
+              {(notes || character.notes).map((note) => (
                 <div key={note.id} className="bg-slate-900/50 border border-slate-800 p-4">
                   <div className="flex justify-between items-start mb-2">
                     <span className="text-xs text-slate-500">
@@ -533,6 +551,16 @@ const CharacterView = () => {
                   <p className="text-slate-300 whitespace-pre-wrap">{note.content}</p>
                 </div>
               ))}
+              {notes === null && character.notes_count > character.notes.length && (
+                <Button onClick={() => fetchNotes()} variant="ghost" size="sm" className="w-full text-slate-400">
+                  Ver todas as notas
+                </Button>
+              )}
+              {notes !== null && notesCursor && (
+                <Button onClick={() => fetchNotes(notesCursor)} variant="ghost" size="sm" className="w-full text-slate-400">
+                  Carregar mais notas
+                </Button>
+              )}
             </div>
           </motion.div>
         )}
@@ -21,6 +21,15 @@ import QuickStatsControl from './QuickStatsControl';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const ROSTER_CACHE_KEY = 'naruto-rpg-roster';
+
+const loadCachedRoster = () => {
+  try {
+    return JSON.parse(localStorage.getItem(ROSTER_CACHE_KEY)) || { characters: [], watermark: null };
+  } catch {
+    return { characters: [], watermark: null };
+  }
+};
 
 const Dashboard = () => {
   const navigate = useNavigate();
@@ -32,10 +41,33 @@ const Dashboard = () => {
     fetchCharacters();
   }, []);
 
+  // Sincroniza só o que mudou desde a última visita (marca d'água guardada com o elenco)
   const fetchCharacters = async () => {
+    const cached = loadCachedRoster();
+    if (cached.characters.length > 0) {
+      setCharacters(cached.characters);
+      setLoading(false);
+    }
     try {
-      const response = await axios.get(`${API}/characters`);
-      setCharacters(response.data);
+      const byId = new Map(cached.characters.map(c => [c.id, c]));
+      let watermark = cached.watermark;
+      let hasMore = true;
+      while (hasMore) {
+        const response = await axios.get(`${API}/characters/sync`, {
+          params: watermark ? { watermark } : {}
+        });
+        response.data.characters.forEach(c => byId.set(c.id, c));
+        response.data.deleted.forEach(id => byId.delete(id));
+        watermark = response.data.watermark;
+        hasMore = response.data.has_more;
+      }
+      const roster = [...byId.values()].sort((a, b) => a.created_at.localeCompare(b.created_at));
+      setCharacters(roster);
+      try {
+        localStorage.setItem(ROSTER_CACHE_KEY, JSON.stringify({ characters: roster, watermark }));
+      } catch {
+        // Sem espaço no localStorage: a próxima visita baixa o elenco inteiro
+      }
     } catch (error) {
       console.error('Erro ao buscar personagens:', error);
       toast.error('Erro ao carregar personagens');
@@ -22,14 +22,10 @@ const SharedCharacter = () => {
   const fetchSharedCharacter = async () => {
     try {
       const charRes = await axios.get(`${API}/characters/share/${shareId}`);
+      // A ficha pública já vem com clã e classe resolvidos
       setCharacter(charRes.data);
-
-      const [clanRes, classRes] = await Promise.all([
-        axios.get(`${API}/clans/${charRes.data.clan_id}`),
-        axios.get(`${API}/classes/${charRes.data.class_id}`)
-      ]);
-      setClan(clanRes.data);
-      setCharClass(classRes.data);
+      setClan(charRes.data.clan);
+      setCharClass(charRes.data.class);
     } catch (error) {
       console.error('Erro ao buscar personagem compartilhado:', error);
       toast.error('Personagem não encontrado');
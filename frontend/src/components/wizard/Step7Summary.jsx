@@ -6,6 +6,7 @@ import useCharacterStore from '@/store/characterStore';
 import { Button } from '@/components/ui/button';
 import { ChevronLeft, Save, Heart, Sparkles, Shield, Zap } from 'lucide-react';
 import { toast } from 'sonner';
+import { newIdempotencyKey } from '@/lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -18,6 +19,8 @@ const Step7Summary = () => {
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [calculatedStats, setCalculatedStats] = useState(null);
+  // Uma chave por resumo: cliques repetidos ou novas tentativas não duplicam o personagem
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -82,7 +85,9 @@ const Step7Summary = () => {
         jutsus: character.jutsus || []
       };
 
-      const response = await axios.post(`${API}/characters`, payload);
+      await axios.post(`${API}/characters`, payload, {
+        headers: { 'Idempotency-Key': idempotencyKey }
+      });
       
       toast.success('Personagem salvo com sucesso!');
       resetCharacter();
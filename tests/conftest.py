@@ -0,0 +1,75 @@
+# Fixtures compartilhadas: os testes usam o backend em memória (e o SQLite onde o SQL muda)
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# O server lê a configuração na importação
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("SYNC_OVERLAP", "0")
+
+from storage.memory import MemoryStorage  # noqa: E402
+from storage.sqlite import SqliteStorage  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def storage(request, tmp_path):
+    backend = MemoryStorage() if request.param == "memory" else SqliteStorage(str(tmp_path / "test.db"))
+    await backend.init()
+    yield backend
+    await backend.close()
+
+
+def make_character(character_id: str, **fields):
+    """Documento mínimo de personagem, como o server grava"""
+    doc = {
+        "id": character_id,
+        "share_id": f"share-{character_id}",
+        "name": character_id.title(),
+        "clan_id": "uzumaki",
+        "class_id": "hunter_ninja",
+        "level": 1,
+        "condition": "Normal",
+        "description": {"name": character_id.title(), "rank": "", "title": ""},
+        "equipment": [],
+        "weapons": [],
+        "jutsus": [],
+        "notes": [],
+        "notes_count": 0,
+        "version": 1,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "updated_at": "2026-01-01T00:00:00+00:00",
+    }
+    doc.update(fields)
+    return doc
+
+
+CHARACTER_BODY = {
+    "name": "Naruto",
+    "clan_id": "uzumaki",
+    "class_id": "hunter_ninja",
+    "attributes": {
+        "strength": 10, "dexterity": 14, "constitution": 16, "intelligence": 10, "wisdom": 10, "charisma": 12,
+    },
+    "description": {"name": "Naruto"},
+    "equipment": [{"name": "Kunai", "quantity": 3}],
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,69 @@
+# Pacotes de conteúdo: validação e troca de pacote compartilhada entre workers
+import asyncio
+import copy
+import json
+
+import pytest
+
+import server
+from content import DEFAULT_PACK, ContentPackError, ContentStore, build_catalog
+
+pytestmark = pytest.mark.anyio
+
+BASE_PACK = json.loads(DEFAULT_PACK.read_bytes())
+
+
+def pack(**changes):
+    raw = copy.deepcopy(BASE_PACK)
+    raw.update(changes)
+    return raw
+
+
+def test_base_pack_builds():
+    catalog = build_catalog(BASE_PACK, DEFAULT_PACK.read_bytes())
+    assert catalog.clan("uzumaki") and catalog.level_from_xp(0) == 1
+
+
+@pytest.mark.parametrize("raw", [
+    pack(version=""),
+    pack(clans=[]),
+    pack(conditions=["Envenenado"]),
+    pack(clans=[BASE_PACK["clans"][0], BASE_PACK["clans"][0]]),
+    pack(clans=[{**BASE_PACK["clans"][0], "bonuses": {"luck": 2}}]),
+    pack(classes=[{**BASE_PACK["classes"][0], "hit_die": "d8"}]),
+    pack(xp_table={str(level): 100 for level in range(1, 21)}),
+    pack(proficiency_bonus={"1": 2}),
+])
+def test_build_catalog_rejects_invalid_packs(raw):
+    with pytest.raises(ContentPackError):
+        build_catalog(raw, b"")
+
+
+async def test_announced_pack_replaces_the_previous_one(storage):
+    assert await storage.settings.get("content") is None
+    assert await storage.settings.put("content", {"version": "1", "etag": "a"}) is None
+    assert await storage.settings.put("content", {"version": "2", "etag": "b"}) == {"version": "1", "etag": "a"}
+    assert await storage.settings.get("content") == {"version": "2", "etag": "b"}
+
+
+async def test_workers_follow_the_announced_pack(tmp_path, monkeypatch):
+    path = tmp_path / "pack.json"
+    path.write_text(json.dumps(BASE_PACK))
+    store = ContentStore(path)
+    monkeypatch.setattr(server, "content", store)
+    monkeypatch.setattr(server, "CONTENT_POLL_INTERVAL", 0.01)
+    await server.storage.settings.put("content", {"version": store.current.version, "etag": store.current.etag})
+
+    follower = asyncio.create_task(server._follow_content())
+    try:
+        # Outro worker recarregou o pacote novo e o anunciou
+        path.write_text(json.dumps(pack(version="2.0.0")))
+        announced = ContentStore(path).current
+        await server.storage.settings.put("content", {"version": "2.0.0", "etag": announced.etag})
+        for _ in range(100):
+            if store.current.etag == announced.etag:
+                break
+            await asyncio.sleep(0.01)
+        assert store.current.version == "2.0.0"
+    finally:
+        follower.cancel()
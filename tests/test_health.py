@@ -0,0 +1,54 @@
+# Readiness: a sonda só faz ping; a inicialização é refeita em segundo plano com backoff
+import asyncio
+
+import pytest
+
+import server
+from health import ReadinessProbe
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_probe_caches_the_result_and_reports_the_error_type():
+    calls = []
+
+    async def check():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    probe = ReadinessProbe(check, ttl=60)
+    assert not await probe.status() and not await probe.status()
+    assert probe.error == "ConnectionError" and len(calls) == 1
+
+
+async def test_check_does_not_rerun_the_initialization(monkeypatch):
+    async def init():
+        raise AssertionError("a sonda não deve inicializar o banco")
+
+    monkeypatch.setattr(server, "_init_storage", init)
+    monkeypatch.setattr(server, "storage_initialized", False)
+    with pytest.raises(RuntimeError):
+        await server._check_storage()
+
+
+async def test_initialization_is_retried_with_backoff(monkeypatch):
+    delays, attempts = [], []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    async def init():
+        attempts.append(1)
+        if len(attempts) < 4:
+            raise ConnectionError("down")
+        server.storage_initialized = True
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    monkeypatch.setattr(server, "_init_storage", init)
+    monkeypatch.setattr(server, "storage_initialized", False)
+    monkeypatch.setattr(server, "STORAGE_INIT_MAX_BACKOFF", 4)
+
+    await server._retry_init_storage()
+    assert delays == [1.0, 2.0, 4.0, 4] and len(attempts) == 4
@@ -0,0 +1,83 @@
+# Reconstrução do histórico a partir de checkpoints e diffs
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+from history import CharacterHistory, diff_fields
+from storage import ItemOperation
+from tests.conftest import CHARACTER_BODY, make_character
+
+pytestmark = pytest.mark.anyio
+
+
+def test_diff_fields_keeps_only_changed_values():
+    before = {"name": "A", "level": 2, "version": 3}
+    assert diff_fields(before, {"name": "A", "level": 3, "xp": 10, "version": 4}) == {"level": 3, "xp": 10}
+
+
+async def write(storage, history, character_id, fields):
+    result = await storage.characters.update(character_id, fields)
+    await history.record_update(result, fields)
+    return result.after
+
+
+async def test_state_at_replays_diffs_after_checkpoints(storage):
+    history = CharacterHistory(storage.history, checkpoint_interval=3)
+    doc = make_character("c1")
+    await storage.characters.insert(doc)
+    await history.record_created(doc)
+    for level in range(2, 8):
+        await write(storage, history, "c1", {"level": level, "updated_at": f"2026-01-0{level}T00:00:00+00:00"})
+
+    entries = await storage.history.list("c1")
+    assert [entry["version"] for entry in entries] == [7, 6, 5, 4, 3, 2, 1]
+    assert [entry["is_checkpoint"] for entry in entries] == [False, True, False, False, True, False, True]
+
+    for version in range(1, 8):
+        state = await history.state_at("c1", version=version)
+        assert state["level"] == version and state["version"] == version
+
+    state = await history.state_at("c1", until=datetime(2026, 1, 4, 12))
+    assert state["level"] == 4
+    assert await history.state_at("c1", until=datetime(2025, 1, 1, tzinfo=timezone.utc)) is None
+
+
+async def test_first_write_to_unversioned_character_keeps_previous_state(storage):
+    history = CharacterHistory(storage.history)
+    legacy = make_character("c1", name="Old", updated_at="2025-06-01T00:00:00+00:00")
+    del legacy["version"]
+    await storage.characters.insert(legacy)
+
+    await write(storage, history, "c1", {"name": "Botched", "updated_at": "2026-01-01T00:00:00+00:00"})
+
+    assert (await history.state_at("c1", version=0))["name"] == "Old"
+    assert (await history.state_at("c1", until=datetime(2025, 12, 1, tzinfo=timezone.utc)))["name"] == "Old"
+    assert (await history.state_at("c1", version=1))["name"] == "Botched"
+
+
+async def test_item_writes_record_the_previous_lists(storage):
+    history = CharacterHistory(storage.history)
+    doc = make_character("c1", equipment=[{"name": "Kunai", "quantity": 1}])
+    await storage.characters.insert(doc)
+    await history.record_created(doc)
+
+    result = await storage.characters.update_items(
+        "c1", [ItemOperation("remove", "equipment", "Kunai")], "2026-01-02T00:00:00+00:00"
+    )
+    await history.record_update(result, {"equipment": result.after["equipment"], "updated_at": result.after["updated_at"]})
+
+    assert (await history.state_at("c1", version=1))["equipment"] == [{"name": "Kunai", "quantity": 1}]
+    assert (await history.state_at("c1", version=2))["equipment"] == []
+
+
+def test_history_failure_does_not_fail_the_creation(client, monkeypatch):
+    async def broken(doc):
+        raise RuntimeError("history down")
+
+    monkeypatch.setattr(server.history, "record_created", broken)
+    headers = {"Idempotency-Key": "create-without-history"}
+    first = client.post("/api/characters", json=CHARACTER_BODY, headers=headers)
+    second = client.post("/api/characters", json=CHARACTER_BODY, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
@@ -0,0 +1,90 @@
+# Idempotency-Key: uma execução por chave, resposta gravada e reservas com lease
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from idempotency import IdempotencyMiddleware
+from storage.memory import MemoryIdempotencyRepository
+from tests.conftest import CHARACTER_BODY
+
+
+@pytest.mark.anyio
+async def test_idempotency_replay_and_conflict(storage):
+    repository = storage.idempotency
+    now = datetime.now(timezone.utc)
+    expires_at, locked_until = now + timedelta(days=1), now + timedelta(seconds=30)
+
+    assert await repository.reserve("k", "f1", "owner-1", expires_at, locked_until) is None
+    in_progress = await repository.reserve("k", "f1", "owner-2", expires_at, locked_until)
+    assert in_progress["status_code"] is None and in_progress["owner"] == "owner-1"
+
+    await repository.complete("k", "owner-1", 201, "application/json", b'{"ok":true}')
+    stored = await repository.reserve("k", "f2", "owner-2", expires_at, locked_until)
+    assert stored["status_code"] == 201 and stored["fingerprint"] == "f1"
+    assert bytes(stored["body"]) == b'{"ok":true}'
+
+
+@pytest.mark.anyio
+async def test_idempotency_stale_reservation_is_taken_over(storage):
+    repository = storage.idempotency
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=1)
+
+    # O worker que reservou morreu: o lease venceu sem resposta gravada
+    await repository.reserve("k", "f", "dead", expires_at, now - timedelta(seconds=1))
+    assert await repository.reserve("k", "f", "retry", expires_at, now + timedelta(seconds=30)) is None
+
+    # O dono antigo não grava nem libera a reserva de outro
+    await repository.complete("k", "dead", 200, "application/json", b"stale")
+    await repository.release("k", "dead")
+    record = await repository.reserve("k", "f", "other", expires_at, now + timedelta(seconds=30))
+    assert record["owner"] == "retry" and record["status_code"] is None
+
+    await repository.release("k", "retry")
+    assert await repository.reserve("k", "f", "other", expires_at, now + timedelta(seconds=30)) is None
+
+
+@pytest.mark.anyio
+async def test_same_key_with_another_query_string_is_rejected():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["query_string"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = IdempotencyMiddleware(app, MemoryIdempotencyRepository())
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    scope = {"type": "http", "method": "POST", "path": "/api/x", "headers": [(b"idempotency-key", b"k")]}
+    await middleware({**scope, "query_string": b"amount=1"}, receive, send)
+    await middleware({**scope, "query_string": b"amount=1"}, receive, send)
+    await middleware({**scope, "query_string": b"amount=100"}, receive, send)
+
+    assert statuses == [200, 200, 422]
+    assert calls == [b"amount=1"]
+
+
+def test_idempotency_key_replays_the_first_response(client):
+    headers = {"Idempotency-Key": "create-once"}
+    first = client.post("/api/characters", json=CHARACTER_BODY, headers=headers)
+    second = client.post("/api/characters", json=CHARACTER_BODY, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+
+def test_idempotency_key_reused_with_another_body_is_rejected(client):
+    headers = {"Idempotency-Key": "reused"}
+    client.post("/api/characters", json=CHARACTER_BODY, headers=headers)
+    response = client.post("/api/characters", json={**CHARACTER_BODY, "name": "Outro"}, headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,99 @@
+# Operações de itens: nomes identificam os itens e o lote inteiro é uma escrita só
+import pytest
+
+from storage import ItemNotFoundError, ItemOperation
+from tests.conftest import CHARACTER_BODY, make_character
+
+pytestmark = pytest.mark.anyio
+
+UPDATED_AT = "2026-02-01T00:00:00+00:00"
+
+
+async def test_update_items_applies_operations_in_order(storage):
+    await storage.characters.insert(make_character("c1", equipment=[{"name": "Kunai", "quantity": 3}]))
+
+    result = await storage.characters.update_items("c1", [
+        ItemOperation("add", "equipment", "Shuriken", item={"name": "Shuriken", "quantity": 2}),
+        ItemOperation("quantity", "equipment", "Kunai", delta=-3),
+        ItemOperation("quantity", "equipment", "Shuriken", delta=1),
+    ], UPDATED_AT)
+
+    assert result.before["equipment"] == [{"name": "Kunai", "quantity": 3}]
+    assert result.before["version"] == 1
+    assert result.after["equipment"] == [{"name": "Shuriken", "quantity": 3}]
+    assert result.after["version"] == 2
+    assert (await storage.characters.get("c1"))["equipment"] == [{"name": "Shuriken", "quantity": 3}]
+    assert await storage.characters.update_items("missing", [], UPDATED_AT) is None
+
+
+async def test_adding_an_existing_name_adds_to_its_quantity(storage):
+    await storage.characters.insert(make_character(
+        "c1", equipment=[{"name": "Kunai", "quantity": 3}], jutsus=[{"name": "Rasengan", "details": "velho"}]
+    ))
+
+    result = await storage.characters.update_items("c1", [
+        ItemOperation("add", "equipment", "Kunai", item={"name": "Kunai", "quantity": 2}),
+        ItemOperation("add", "jutsus", "Rasengan", item={"name": "Rasengan", "details": "novo"}),
+    ], UPDATED_AT)
+
+    assert result.after["equipment"] == [{"name": "Kunai", "quantity": 5}]
+    assert result.after["jutsus"] == [{"name": "Rasengan", "details": "novo"}]
+
+
+async def test_legacy_duplicates_of_a_touched_name_are_merged(storage):
+    await storage.characters.insert(make_character("c1", equipment=[
+        {"name": "Kunai", "quantity": 1}, {"name": "Corda", "quantity": 1},
+        {"name": "Kunai", "quantity": 2}, {"name": "Corda", "quantity": 1},
+    ]))
+
+    result = await storage.characters.update_items(
+        "c1", [ItemOperation("quantity", "equipment", "Kunai", delta=1)], UPDATED_AT
+    )
+    # Só o nome tocado é consolidado
+    assert result.after["equipment"] == [
+        {"name": "Kunai", "quantity": 4}, {"name": "Corda", "quantity": 1}, {"name": "Corda", "quantity": 1},
+    ]
+
+
+async def test_missing_target_writes_nothing(storage):
+    await storage.characters.insert(make_character("c1", equipment=[{"name": "Kunai", "quantity": 3}]))
+
+    for operation in (ItemOperation("quantity", "equipment", "Shuriken", delta=1),
+                      ItemOperation("remove", "weapons", "Kunai")):
+        with pytest.raises(ItemNotFoundError):
+            await storage.characters.update_items(
+                "c1", [ItemOperation("add", "equipment", "Bomba", item={"name": "Bomba", "quantity": 1}), operation],
+                UPDATED_AT
+            )
+
+    stored = await storage.characters.get("c1")
+    assert stored["version"] == 1 and stored["equipment"] == [{"name": "Kunai", "quantity": 3}]
+    # Um item adicionado antes no mesmo lote pode ser alterado
+    result = await storage.characters.update_items("c1", [
+        ItemOperation("add", "weapons", "Katana", item={"name": "Katana", "quantity": 1}),
+        ItemOperation("quantity", "weapons", "Katana", delta=1),
+    ], UPDATED_AT)
+    assert result.after["weapons"] == [{"name": "Katana", "quantity": 2}]
+
+
+def test_item_batch_route(client):
+    character = client.post("/api/characters", json=CHARACTER_BODY).json()
+    url = f"/api/characters/{character['id']}/items"
+
+    response = client.patch(url, json={"operations": [
+        {"op": "quantity", "target": "equipment", "name": "Kunai", "quantity": -1},
+        {"op": "add", "target": "equipment", "name": "Kunai", "quantity": 2},
+        {"op": "add", "target": "weapons", "name": "Katana"},
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["equipment"] == [{"name": "Kunai", "quantity": 4}]
+    version = response.json()["version"]
+
+    response = client.patch(url, json={"operations": [
+        {"op": "quantity", "target": "equipment", "name": "Shuriken", "quantity": 1},
+    ]})
+    assert response.status_code == 404
+    updated = client.get(f"/api/characters/{character['id']}").json()
+    assert updated["version"] == version
+    assert [weapon["name"] for weapon in updated["weapons"]] == ["Katana"]
+    assert len(client.get(f"/api/characters/{character['id']}/history").json()) == version
@@ -0,0 +1,46 @@
+# Logging pela fila: JSON com id da requisição e loggers do uvicorn sem escrita síncrona
+import json
+import logging
+
+import pytest
+
+from logs import REQUEST_ID, ContextQueueHandler, JsonFormatter, setup_logging
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    saved = list(root.handlers), root.level
+    yield
+    root.handlers[:] = saved[0]
+    root.setLevel(saved[1])
+
+
+def test_record_carries_request_id_and_extra_fields():
+    token = REQUEST_ID.set("req-1")
+    try:
+        record = logging.LogRecord("app", logging.INFO, __file__, 1, "criado %s", ("x",), None)
+        record.route = "/api/characters"
+        record = ContextQueueHandler(None).prepare(record)
+    finally:
+        REQUEST_ID.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "criado x" and entry["request_id"] == "req-1"
+    assert entry["route"] == "/api/characters"
+
+
+def test_uvicorn_loggers_go_through_the_queue(restore_logging):
+    # Como o dictConfig do uvicorn deixa os loggers antes de importar o app
+    for name in ("uvicorn.error", "uvicorn.access"):
+        logger = logging.getLogger(name)
+        logger.addHandler(logging.StreamHandler())
+        logger.propagate = False
+
+    setup_logging()
+
+    error_logger, access_logger = logging.getLogger("uvicorn.error"), logging.getLogger("uvicorn.access")
+    assert error_logger.handlers == [] and error_logger.propagate
+    assert any(isinstance(handler, ContextQueueHandler) for handler in logging.getLogger().handlers)
+    # Sem handlers o uvicorn nem monta as linhas de acesso (RequestLogMiddleware já as registra)
+    assert not access_logger.hasHandlers()
@@ -0,0 +1,60 @@
+# Notas em coleção própria: paginação por cursor e migração das notas embutidas
+import pytest
+
+from tests.conftest import CHARACTER_BODY, make_character
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_notes_cursor_is_newest_first_without_gaps(storage):
+    await storage.characters.insert(make_character("c1"))
+    for index in range(5):
+        await storage.notes.add({
+            "id": f"n{index}", "character_id": "c1", "content": str(index),
+            # Duas notas no mesmo instante: o id desempata
+            "created_at": f"2026-01-0{1 + index // 2}T00:00:00+00:00", "updated_at": None,
+        })
+
+    seen = []
+    before = None
+    while True:
+        page = await storage.notes.list("c1", limit=2, before=before)
+        if not page:
+            break
+        seen.extend(note["id"] for note in page)
+        before = (page[-1]["created_at"], page[-1]["id"])
+    assert seen == ["n4", "n3", "n2", "n1", "n0"]
+
+
+async def test_migrate_notes_only_once(storage):
+    legacy = make_character("c1", notes=[{"id": "n1", "content": "x", "created_at": "2026-01-01T00:00:00+00:00"}])
+    del legacy["notes_count"]
+    await storage.characters.insert(legacy)
+
+    pending = await storage.characters.find_without_notes_count()
+    assert [doc["id"] for doc in pending] == ["c1"]
+    # Dois workers leram o mesmo personagem: só a primeira migração vale
+    assert await storage.characters.migrate_notes("c1", pending[0]["notes"], 1)
+    assert not await storage.characters.migrate_notes("c1", pending[0]["notes"], 1)
+    assert (await storage.characters.get("c1"))["notes_count"] == 1
+    assert await storage.characters.find_without_notes_count() == []
+
+
+def test_notes_are_paged_newest_first(client):
+    character = client.post("/api/characters", json=CHARACTER_BODY).json()
+    for index in range(5):
+        client.post(f"/api/characters/{character['id']}/notes", json={"content": f"nota {index}"})
+
+    contents, cursor = [], None
+    while True:
+        page = client.get(
+            f"/api/characters/{character['id']}/notes", params={"limit": 2, **({"cursor": cursor} if cursor else {})}
+        ).json()
+        contents.extend(note["content"] for note in page["notes"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert contents == [f"nota {index}" for index in reversed(range(5))]
+
+    refreshed = client.get(f"/api/characters/{character['id']}").json()
+    assert refreshed["notes_count"] == 5 and len(refreshed["notes"]) == 3
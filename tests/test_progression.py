@@ -0,0 +1,37 @@
+# Projeção de progressão 1-20 calculada em lote e memoizada
+from content import DEFAULT_PACK, load_pack
+from rules import progression
+from tests.conftest import CHARACTER_BODY
+
+CATALOG = load_pack(DEFAULT_PACK)
+ATTRIBUTES = CHARACTER_BODY["attributes"]
+
+
+def test_progression_covers_every_level_with_the_xp_table():
+    levels = progression(CATALOG, "uzumaki", "hunter_ninja", ATTRIBUTES)
+    assert [row["level"] for row in levels] == list(range(1, 21))
+    assert [row["xp"] for row in levels] == [CATALOG.xp_table[level] for level in range(1, 21)]
+    assert [row["proficiency_bonus"] for row in levels] == [CATALOG.proficiency_table[level] for level in range(1, 21)]
+    # CON 16 + 2 do clã Uzumaki: modificador +4 somado ao d8 da classe
+    assert levels[0]["hp"] == 12 and levels[19]["hp"] == 240
+
+
+def test_progression_is_memoized_by_class_and_modifiers():
+    levels = progression(CATALOG, "uzumaki", "hunter_ninja", ATTRIBUTES)
+    # Força e CON 17 (mesmo modificador) não mudam a tabela: o resultado é o mesmo objeto
+    same = progression(CATALOG, "uzumaki", "hunter_ninja", {**ATTRIBUTES, "strength": 18, "constitution": 17})
+    assert same is levels
+    other = progression(CATALOG, "uzumaki", "hunter_ninja", {**ATTRIBUTES, "constitution": 18})
+    assert other is not levels and other[0]["hp"] > levels[0]["hp"]
+
+
+def test_progression_of_unknown_clan_or_class():
+    assert progression(CATALOG, "desconhecido", "hunter_ninja", ATTRIBUTES) is None
+    assert progression(CATALOG, "uzumaki", "desconhecida", ATTRIBUTES) is None
+
+
+def test_progression_routes(client):
+    build = {"clan_id": "uzumaki", "class_id": "hunter_ninja", "attributes": ATTRIBUTES}
+    projected = client.post("/api/progression", json=build).json()
+    character = client.post("/api/characters", json=CHARACTER_BODY).json()
+    assert client.get(f"/api/characters/{character['id']}/progression").json()["levels"] == projected["levels"]
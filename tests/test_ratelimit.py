@@ -0,0 +1,113 @@
+# Token bucket: reposição, verificação conjunta dos buckets e IP do cliente atrás de proxies
+import pytest
+
+import ratelimit
+from ratelimit import (
+    MemoryBucketStore, RateLimit, RateLimitMiddleware, RouteLimit, SqliteBucketStore, _refill, parse_limit,
+    parse_networks
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_parse_limit():
+    assert parse_limit("5:20") == RateLimit(5.0, 20.0)
+    assert parse_limit("3") == RateLimit(3.0, 3.0)
+    assert parse_limit("off") is None and parse_limit("") is None
+
+
+@pytest.mark.parametrize("value", ["0", "0:5", "-1:5", "5:0.5", "nan", "inf:5", "x"])
+def test_parse_limit_rejects_invalid_limits(value):
+    with pytest.raises(ValueError):
+        parse_limit(value)
+
+
+def test_refill_is_capped_at_burst():
+    limit = RateLimit(rate=2, burst=5)
+    assert _refill(0, 10.0, 11.0, limit) == 2
+    assert _refill(4, 10.0, 20.0, limit) == 5
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def store(request, tmp_path):
+    bucket_store = MemoryBucketStore() if request.param == "memory" else SqliteBucketStore(str(tmp_path / "rl.db"))
+    yield bucket_store
+    await bucket_store.close()
+
+
+async def test_bucket_refills_over_time(store, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(ratelimit.time, "time", lambda: clock[0])
+    limit = RateLimit(rate=1, burst=2)
+
+    assert (await store.take([("k", limit)]))[0] is None
+    assert (await store.take([("k", limit)]))[0] is None
+    rejected, wait = await store.take([("k", limit)])
+    assert rejected == 0 and wait == pytest.approx(1.0)
+
+    clock[0] += 1.5
+    assert (await store.take([("k", limit)]))[0] is None
+    rejected, wait = await store.take([("k", limit)])
+    assert rejected == 0 and wait == pytest.approx(0.5)
+
+
+async def test_rejected_bucket_does_not_spend_the_others(store):
+    client, character = RateLimit(rate=0.001, burst=2), RateLimit(rate=0.001, burst=1)
+
+    assert (await store.take([("client", client), ("char-a", character)]))[0] is None
+    # O personagem recusa: o token do cliente continua disponível
+    assert (await store.take([("client", client), ("char-a", character)]))[0] == 1
+    assert (await store.take([("client", client), ("char-b", character)]))[0] is None
+    assert (await store.take([("client", client), ("char-c", character)]))[0] == 0
+
+
+def client_of(middleware, peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return middleware._client({"client": (peer, 1234), "headers": headers})
+
+
+def test_client_ip_without_proxies_ignores_forwarded_header():
+    middleware = RateLimitMiddleware(None, [])
+    assert client_of(middleware, "10.0.0.5", "1.1.1.1") == "10.0.0.5"
+
+
+def test_client_ip_skips_configured_proxy_hops():
+    middleware = RateLimitMiddleware(None, [], proxy_hops=1)
+    assert client_of(middleware, "10.0.0.5", "6.6.6.6, 203.0.113.9") == "203.0.113.9"
+    assert client_of(middleware, "10.0.0.5") == "10.0.0.5"
+
+
+def test_client_ip_skips_trusted_networks():
+    middleware = RateLimitMiddleware(None, [], trusted_proxies=parse_networks("10.0.0.0/8, 192.168.1.1"))
+    assert client_of(middleware, "10.0.0.5", "6.6.6.6, 203.0.113.9, 192.168.1.1") == "203.0.113.9"
+    # Conexão direta de fora das redes confiáveis: o cabeçalho é ignorado
+    assert client_of(middleware, "8.8.8.8", "6.6.6.6") == "8.8.8.8"
+
+
+async def test_middleware_rejects_with_retry_after():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = RateLimitMiddleware(
+        app, [RouteLimit("POST", "/api/roll-dice", client=RateLimit(rate=0.001, burst=1))]
+    )
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append((message["status"], dict(message["headers"]).get(b"retry-after")))
+
+    scope = {"type": "http", "method": "POST", "path": "/api/roll-dice", "client": ("1.2.3.4", 1), "headers": []}
+    await middleware(scope, None, send)
+    await middleware(scope, None, send)
+    await middleware({**scope, "method": "GET"}, None, send)
+
+    assert statuses[0] == (200, None)
+    assert statuses[1][0] == 429 and int(statuses[1][1]) >= 1
+    assert statuses[2] == (200, None)
+    assert len(calls) == 2
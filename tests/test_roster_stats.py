@@ -0,0 +1,38 @@
+# Agregações do elenco: o mesmo resultado nos backends em memória e SQLite
+import pytest
+
+from tests.conftest import make_character
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_empty_roster(storage):
+    stats = await storage.characters.roster_stats()
+    assert stats["total"] == 0 and stats["class_averages"] == []
+
+
+async def test_roster_stats_group_and_average(storage):
+    await storage.characters.insert(make_character("c1", level=1, hp=10, max_hp=20, chakra=4, max_chakra=8))
+    await storage.characters.insert(make_character("c2", level=3, hp=30, max_hp=40, chakra=6, max_chakra=8))
+    await storage.characters.insert(make_character(
+        "c3", clan_id="uchiha", class_id="ninja_medico", level=3, condition="Envenenado", hp=5, chakra=2
+    ))
+
+    stats = await storage.characters.roster_stats()
+    assert stats["total"] == 3
+    assert stats["by_clan"] == [{"clan_id": "uchiha", "count": 1}, {"clan_id": "uzumaki", "count": 2}]
+    assert stats["by_level"] == [{"level": 1, "count": 1}, {"level": 3, "count": 2}]
+    assert stats["by_condition"] == [{"condition": "Envenenado", "count": 1}, {"condition": "Normal", "count": 2}]
+    assert stats["class_averages"] == [
+        # Sem max_hp/max_chakra o máximo é o valor atual
+        {"class_id": "hunter_ninja", "count": 2,
+         "avg_hp": 20, "avg_max_hp": 30, "avg_chakra": 5, "avg_max_chakra": 8},
+        {"class_id": "ninja_medico", "count": 1,
+         "avg_hp": 5, "avg_max_hp": 5, "avg_chakra": 2, "avg_max_chakra": 2},
+    ]
+
+
+def test_analytics_route_lists_every_condition(client):
+    stats = client.get("/api/analytics/roster").json()
+    conditions = [item["condition"] for item in stats["by_condition"]]
+    assert conditions[0] == "Normal" and len(conditions) == len(set(conditions)) > 1
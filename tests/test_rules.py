@@ -0,0 +1,38 @@
+# Motor de regras: bônus do clã nos atributos derivados e memoização por catálogo
+import json
+
+from content import DEFAULT_PACK, build_catalog, load_pack
+from rules import _cached_stats, calculate_stats, compile_rules
+from tests.conftest import CHARACTER_BODY
+
+CATALOG = load_pack(DEFAULT_PACK)
+ATTRIBUTES = CHARACTER_BODY["attributes"]
+
+
+def test_clan_bonus_is_applied_before_the_modifiers():
+    stats = calculate_stats(CATALOG, "uzumaki", "hunter_ninja", ATTRIBUTES)
+    # CON 16 + 2 do clã Uzumaki = 18: modificador +4; d8 da classe
+    assert stats["modifiers"]["constitution"] == 4
+    assert stats["hp"] == stats["max_hp"] == 12
+    assert stats["armor_class"] == 10 + 2 + stats["proficiency_bonus"] // 2
+
+
+def test_unknown_clan_or_class_returns_none():
+    assert calculate_stats(CATALOG, "desconhecido", "hunter_ninja", ATTRIBUTES) is None
+    assert calculate_stats(CATALOG, "uzumaki", "desconhecida", ATTRIBUTES) is None
+
+
+def test_repeated_builds_hit_the_cache():
+    attributes = {**ATTRIBUTES, "wisdom": 13}
+    first = calculate_stats(CATALOG, "uzumaki", "hunter_ninja", attributes, level=7)
+    hits = _cached_stats.cache_info().hits
+    assert calculate_stats(CATALOG, "uzumaki", "hunter_ninja", attributes, level=7) == first
+    assert _cached_stats.cache_info().hits == hits + 1
+
+
+def test_rules_are_compiled_per_catalog():
+    source = DEFAULT_PACK.read_bytes()
+    reloaded = build_catalog(json.loads(source), source)
+    # Um catálogo recarregado não reaproveita as regras do anterior
+    assert compile_rules(CATALOG, "uzumaki", "hunter_ninja") is compile_rules(CATALOG, "uzumaki", "hunter_ninja")
+    assert compile_rules(reloaded, "uzumaki", "hunter_ninja") is not compile_rules(CATALOG, "uzumaki", "hunter_ninja")
@@ -0,0 +1,32 @@
+# Busca de personagens com filtros, igual nos backends em memória e SQLite
+import pytest
+
+from storage import CharacterFilter
+from tests.conftest import make_character
+
+pytestmark = pytest.mark.anyio
+
+
+async def names(storage, **filters):
+    return sorted(doc["name"] for doc in await storage.characters.find(CharacterFilter(**filters)))
+
+
+async def test_text_search_requires_every_term(storage):
+    await storage.characters.insert(make_character("c1", name="Naruto Uzumaki", description={"title": "Hokage"}))
+    await storage.characters.insert(make_character("c2", name="Itachi", description={"title": "Gênio do clã"}))
+
+    assert await names(storage, text="naruto hokage") == ["Naruto Uzumaki"]
+    assert await names(storage, text="naruto itachi") == []
+    assert await names(storage, text="GENIO clã") == ["Itachi"]
+    # Palavras inteiras, não trechos
+    assert await names(storage, text="aru") == []
+
+
+async def test_filters_combine(storage):
+    await storage.characters.insert(make_character("c1", name="Sasuke", clan_id="uchiha", level=5))
+    await storage.characters.insert(make_character("c2", name="Sakura", level=3))
+    await storage.characters.insert(make_character("c3", name="Itachi", clan_id="uchiha", level=12))
+
+    assert await names(storage, clan_id="uchiha", max_level=10) == ["Sasuke"]
+    assert await names(storage, name_prefix="sa", min_level=4) == ["Sasuke"]
+    assert await names(storage, name_prefix="Sa") == ["Sakura", "Sasuke"]
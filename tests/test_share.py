@@ -0,0 +1,53 @@
+# Fichas compartilhadas pré-renderizadas: versão mais nova, ETag e marca de remoção
+import pytest
+
+import server
+from tests.conftest import CHARACTER_BODY
+
+
+@pytest.mark.anyio
+async def test_share_snapshot_keeps_newest_version(storage):
+    await storage.share_snapshots.put("s1", "c1", 2, "pack-a", b'{"v":2}', '"e2"')
+    await storage.share_snapshots.put("s1", "c1", 1, "pack-a", b'{"v":1}', '"e1"')
+    snapshot = await storage.share_snapshots.get("s1")
+    assert bytes(snapshot["body"]) == b'{"v":2}' and snapshot["etag"] == '"e2"'
+
+    # Mesma versão, outro pacote de conteúdo: republica
+    await storage.share_snapshots.put("s1", "c1", 2, "pack-b", b'{"v":2,"p":"b"}', '"e3"')
+    assert (await storage.share_snapshots.get("s1"))["content_etag"] == "pack-b"
+
+
+@pytest.mark.anyio
+async def test_late_put_does_not_overwrite_the_deletion(storage):
+    await storage.share_snapshots.put("s1", "c1", 2, "pack-a", b'{"v":2}', '"e2"')
+    await storage.share_snapshots.delete("s1", "c1")
+    assert await storage.share_snapshots.get("s1") is None
+
+    # Escrita suspensa antes da remoção publicando depois dela (ou criação que ainda não publicou)
+    await storage.share_snapshots.put("s1", "c1", 3, "pack-a", b'{"v":3}', '"e3"')
+    await storage.share_snapshots.delete("s2", "c2")
+    await storage.share_snapshots.put("s2", "c2", 1, "pack-a", b'{"v":1}', '"e1"')
+    assert await storage.share_snapshots.get("s1") is None
+    assert await storage.share_snapshots.get("s2") is None
+
+
+def test_share_snapshot_is_public_and_validated_by_etag(client):
+    character = client.post("/api/characters", json=CHARACTER_BODY).json()
+    url = f"/api/characters/share/{character['share_id']}"
+
+    response = client.get(url)
+    body = response.json()
+    assert "id" not in body and "notes" not in body
+    assert body["clan"]["id"] == "uzumaki" and body["class"]["id"] == "hunter_ninja"
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/api/characters/{character['id']}/xp", json={"xp": 300})
+    response = client.get(url)
+    assert response.headers["etag"] != etag and response.json()["xp"] == 300
+
+    stale = client.get(f"/api/characters/{character['id']}").json()
+    client.delete(f"/api/characters/{character['id']}")
+    # Uma atualização que ainda não tinha publicado termina depois da remoção
+    client.portal.call(server.publish_share_snapshot, {**stale, "version": stale["version"] + 1})
+    assert client.get(url).status_code == 404
@@ -0,0 +1,40 @@
+# Contrato básico do repositório de personagens, igual nos backends em memória e SQLite
+import pytest
+
+from tests.conftest import make_character
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_insert_and_lookup_by_id_and_share_id(storage):
+    await storage.characters.insert(make_character("c1"))
+
+    assert (await storage.characters.get("c1"))["name"] == "C1"
+    assert (await storage.characters.get_by_share_id("share-c1"))["id"] == "c1"
+    assert await storage.characters.get("missing") is None
+    assert await storage.characters.get_by_share_id("missing") is None
+
+
+async def test_update_returns_both_states_and_bumps_version(storage):
+    await storage.characters.insert(make_character("c1"))
+
+    result = await storage.characters.update("c1", {"level": 4})
+    assert result.before["level"] == 1 and result.before["version"] == 1
+    assert result.after["level"] == 4 and result.after["version"] == 2
+    assert (await storage.characters.get("c1"))["level"] == 4
+    assert await storage.characters.update("missing", {"level": 4}) is None
+
+
+async def test_delete_frees_the_share_id(storage):
+    await storage.characters.insert(make_character("c1"))
+
+    assert await storage.characters.delete("c1")
+    assert not await storage.characters.delete("c1")
+    assert await storage.characters.get_by_share_id("share-c1") is None
+
+
+async def test_find_pages_in_insertion_order(storage):
+    for character_id in ("a", "b", "c"):
+        await storage.characters.insert(make_character(character_id))
+
+    assert [doc["id"] for doc in await storage.characters.find(skip=1, limit=5)] == ["b", "c"]